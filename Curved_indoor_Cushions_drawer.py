@@ -2,27 +2,37 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import black, blue, red, green
-from math import pi, cos, sin
-
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
-
-def draw_curved_cushion(c, cushion):
+from math import pi, sin
+from text_layout import draw_wrapped_text, wrapped_text_bottom
+from arc_geometry import arc_samples
+
+REQUIRED_DIMENSIONS = ("front_width_straight", "back_width_straight", "thickness", "front_width_curved", "back_width_curved")
+
+
+def quarter_arc(path, center_x, center_y, radius, reverse=False):
+    # Quarter circle from 0 to 90 degrees (90 to 0 with reverse) as Bezier curves
+    if reverse:
+        path.arc(center_x - radius, center_y - radius, center_x + radius, center_y + radius, 90, -90)
+    else:
+        path.arc(center_x - radius, center_y - radius, center_x + radius, center_y + radius, 0, 90)
+
+
+def draw_dashed_quarter_arc(c, center_x, center_y, radius, segments, dash=2, reverse=False):
+    """Stroke a dashed quarter arc that looks like the old segment-by-segment one.
+
+    Those arcs were segments - 1 separately stroked chords, each restarting
+    the dash, so one dash period spans one chord: ``dash`` on, the rest off.
+    Leaves the canvas dashed (dash, dash) as the chords did.
+    """
+    chord = 2 * abs(radius) * sin(pi / 4 / (segments - 1))
+    c.setDash([dash, chord - dash] if chord > dash else [])
+    p = c.beginPath()
+    quarter_arc(p, center_x, center_y, radius, reverse)
+    c.drawPath(p, stroke=1, fill=0)
+    c.setDash(dash, dash)
+
+
+def draw_curved_cushion(c, cushion, diagram_only=False):
     page_width, page_height = letter
 
     cushion_name = cushion.get('cushion_name', 'Curved Cushion')
@@ -52,8 +62,9 @@ def draw_curved_cushion(c, cushion):
     zipper_position = cushion['zipper']
     left_x = 1 * inch
     y = page_height - 1 * inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
     y -= 0.4 * inch
 
     specs = [
@@ -82,11 +93,15 @@ def draw_curved_cushion(c, cushion):
     
 
     for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
         max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+        if diagram_only:
+            # Not drawn, but the diagram below is placed from where the table ends
+            y = wrapped_text_bottom(y, value, max_value_width)
+        else:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
         y -= 4  # extra spacing between spec rows
 
 
@@ -171,11 +186,10 @@ def draw_curved_cushion(c, cushion):
 
 
     segments = 100
-    theta_vals = [i * (pi/2) / (segments - 1) for i in range(segments)]
-    x_inner = [center_x + inner_r * cos(t) for t in theta_vals]
-    y_inner = [center_y + inner_r * sin(t) for t in theta_vals]
-    x_outer = [center_x + outer_r * cos(t) for t in theta_vals]
-    y_outer = [center_y + outer_r * sin(t) for t in theta_vals]
+    # The arcs are stroked as curves; labels and edges only need these samples
+    arc_marks = (0, segments // 2, -1)
+    x_inner, y_inner = arc_samples(center_x, center_y, inner_r, segments, arc_marks)
+    x_outer, y_outer = arc_samples(center_x, center_y, outer_r, segments, arc_marks)
 
           # ----------------------------- #
     # 📐 Dimension Arrows + Numbers #
@@ -240,14 +254,10 @@ def draw_curved_cushion(c, cushion):
     # Draw arcs
     c.setStrokeColor(black)
     # c.setDash(2,2)
-    for i in range(segments - 1):
-        c.line(x_inner[i], y_inner[i], x_inner[i+1], y_inner[i+1])
-
-
-    c.setStrokeColor(black)
-    # c.setDash(2,2)
-    for i in range(segments - 1):
-        c.line(x_outer[i], y_outer[i], x_outer[i+1], y_outer[i+1])
+    p = c.beginPath()
+    quarter_arc(p, center_x, center_y, inner_r)
+    quarter_arc(p, center_x, center_y, outer_r)
+    c.drawPath(p, stroke=1, fill=0)
 
     c.line(x_inner[0], y_inner[0], x_outer[0], y_outer[0])
     c.line(x_inner[-1], y_inner[-1], x_outer[-1], y_outer[-1])
@@ -344,26 +354,21 @@ def draw_curved_cushion(c, cushion):
     piping_offset = 6  # outward/inward from cushion edges
 
     # Offset arcs
-    x_piping_inner = [center_x + (inner_r - piping_offset) * cos(t) for t in theta_vals]
-    y_piping_inner = [center_y + (inner_r - piping_offset) * sin(t) for t in theta_vals]
-    x_piping_outer = [center_x + (outer_r + piping_offset) * cos(t) for t in theta_vals]
-    y_piping_outer = [center_y + (outer_r + piping_offset) * sin(t) for t in theta_vals]
+    x_piping_inner, y_piping_inner = arc_samples(center_x, center_y, inner_r - piping_offset, segments, arc_marks)
+    x_piping_outer, y_piping_outer = arc_samples(center_x, center_y, outer_r + piping_offset, segments, arc_marks)
 
     # Set dotted line style
     c.setStrokeColor(blue)
     c.setDash(2, 2)
 
     # Draw inner arc (front curve)
-    for i in range(segments - 1):
-
-        c.line(x_piping_inner[i], y_piping_inner[i], x_piping_inner[i+1], y_piping_inner[i+1])
+    draw_dashed_quarter_arc(c, center_x, center_y, inner_r - piping_offset, segments)
 
     # Right side (connect end of inner to end of outer)
     c.line(x_piping_inner[-1]-2, y_piping_inner[-1] - 2, x_piping_outer[-1]-3, y_piping_outer[-1] - 2)
 
     # Draw outer arc (back curve)
-    for i in reversed(range(1, segments)):
-        c.line(x_piping_outer[i], y_piping_outer[i], x_piping_outer[i-1], y_piping_outer[i-1])
+    draw_dashed_quarter_arc(c, center_x, center_y, outer_r + piping_offset, segments, reverse=True)
 
     # Left side (connect start of outer to start of inner)
     c.line(x_piping_outer[0]-3, y_piping_outer[0]-3, x_piping_inner[0]-2, y_piping_inner[0]-3)
@@ -395,11 +400,9 @@ def draw_curved_cushion(c, cushion):
 
     if zipper_position.lower() == "long side" :
         # Zipper along entire back curve (outer arc) with offset
-        x_zipper_arc = [center_x + (outer_r + arc_zipper_offset) * cos(t) for t in theta_vals]
-        y_zipper_arc = [center_y + (outer_r + arc_zipper_offset) * sin(t) for t in theta_vals]
+        x_zipper_arc, y_zipper_arc = arc_samples(center_x, center_y, outer_r + arc_zipper_offset, segments, arc_marks)
 
-        for i in range(segments - 1):
-            c.line(x_zipper_arc[i]+10, y_zipper_arc[i]+10, x_zipper_arc[i + 1]+10, y_zipper_arc[i + 1]+10)
+        draw_dashed_quarter_arc(c, center_x + 10, center_y + 10, outer_r + arc_zipper_offset, segments)
 
         # Label at middle of arc
         mid_idx = segments // 2
@@ -2,27 +2,11 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import red, black, green, blue
 from reportlab.pdfgen import canvas
+from text_layout import draw_wrapped_text
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
-
+REQUIRED_DIMENSIONS = ("length", "top_width", "bottom_width", "ear", "thickness")
 
-def draw_t_shape(c, cushion):
+def draw_t_shape(c, cushion, diagram_only=False):
     page_width, page_height = letter
     cushion_name = cushion.get('cushion_name', 'T-Shape Cushion')
     length = cushion['length']
@@ -38,9 +22,10 @@ def draw_t_shape(c, cushion):
     quantity = cushion.get('quantity', 1)
 
 
-    c.setFont("Helvetica-Bold", 14)
     y = page_height - inch
-    c.drawString(inch, y, f"{cushion_name} (Quantity: {quantity})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(inch, y, f"{cushion_name} (Quantity: {quantity})")
     y -= 0.4 * inch
 
     specs = [
@@ -61,13 +46,14 @@ def draw_t_shape(c, cushion):
     # y = page_height - 3 * inch # Adjusted initial y position for specs
     
 
-    for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
-        max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
-        y -= 4  # extra spacing between spec rows
+    if not diagram_only:
+        for label, value in specs:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+            y -= 4  # extra spacing between spec rows
 
     # Diagram calculation
     scale = (page_width / 3) / max(length, top_width, bottom_width, ear)
@@ -1,421 +1,370 @@
-from flask import Flask, request, jsonify, send_from_directory, url_for, render_template_string
-from reportlab.lib.pagesizes import letter
+from flask import Flask, Response, g, request, jsonify, send_file, url_for
+import contextlib
+import functools
+import io
+import json
+import logging
 import os
+import time
 import uuid
-from pypdf import PdfReader, PdfWriter, Transformation
-from rectangle_drawer import draw_rectangle
-from trapezium_drawer import draw_trapezium
-from L_shaped_drawer import draw_l_shape
-from clipped_trapeze_drawer import draw_clipped_trapeze
-from T_shaped_drawer import draw_t_shape
-from round_drawer import draw_round
-from E_triangle_drawer import draw_equilateral_triangle
-from curved_drawer import draw_curved 
-from semi_round_drawer import draw_semi_round
-from right_triangle_drawer import draw_right_triangle
-from Curved_indoor_Cushions_drawer import draw_curved_cushion
-from right_cushion_drawer import draw_right_cushion
-from tapered_bolster_drawer import draw_tapered_bolster
+import zipfile
 from counter_utils import increment_counter
-from left_cushion_drawer import draw_left_cushion
+from confirmation_pdf import RENDER_MODES, build_confirmation_pdf, save_pdf_bytes
+from document_cache import DOCUMENT_CACHE, order_cache_key
+from job_queue import QueueFullError, get_job, render_batch, submit_job
+from metrics import CUSHIONS_PER_ORDER, ERRORS, REQUEST_SECONDS, REQUESTS, render_metrics
+from log_utils import log_payload, request_id_var, setup_logging
+from pdf_storage import PDF_DIR, new_pdf_name, new_pdf_path, register_pdf, resolve_pdf, start_evictor
+from index_page import IndexPage
+from profiling import PROFILE_ALL, PROFILE_MEMORY, PROFILE_TOKEN, is_admin, list_profiles, profile_request
 
 
 
 
+setup_logging()
+logger = logging.getLogger("confirmation.app")
+
 app = Flask(__name__)
-PDF_DIR = os.path.join(os.getcwd(), "pdfs")
-os.makedirs(PDF_DIR, exist_ok=True)
+# Let nginx/Apache send stored PDFs (X-Sendfile) when the deployment supports it
+app.config["USE_X_SENDFILE"] = os.environ.get("USE_X_SENDFILE", "0") == "1"
+# Default pipeline; a request can override it with ?render_mode=merge|single_pass
+RENDER_MODE = os.environ.get("RENDER_MODE", "merge")
+# Keep intermediate PDFs in memory and write only the final file (override with ?in_memory=0|1)
+PDF_IN_MEMORY = os.environ.get("PDF_IN_MEMORY", "0") == "1"
+# Chunk size when returning the PDF itself (?response=pdf or Accept: application/pdf)
+PDF_STREAM_CHUNK_BYTES = int(os.environ.get("PDF_STREAM_CHUNK_BYTES", 64 * 1024))
+# Stored confirmations never change, so clients may cache them this long
+PDF_CACHE_MAX_AGE = int(os.environ.get("PDF_CACHE_MAX_AGE", 365 * 24 * 3600))
+# Largest number of orders accepted by one /generate-confirmations/batch call
+BATCH_MAX_ORDERS = int(os.environ.get("BATCH_MAX_ORDERS", 500))
+
+
+@app.before_request
+def start_request():
+    g.request_started = time.perf_counter()
+    start_evictor()
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    g.request_id_token = request_id_var.set(request_id)
+
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or "unknown"
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if response.status_code >= 500:
+        ERRORS.inc(endpoint=endpoint)
+    started = g.get("request_started")
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+    response.headers["X-Request-ID"] = request_id_var.get()
+    return response
+
+
+@app.teardown_request
+def end_request(exc):
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        request_id_var.reset(token)
+
+
+def wants_pdf_response():
+    if request.args.get("response") == "pdf":
+        return True
+    if request.args.get("response") == "link":
+        return False
+    return request.accept_mimetypes.best_match(["application/json", "application/pdf"]) == "application/pdf"
+
+
+def stream_pdf(pdf_bytes, filename):
+    def chunks():
+        view = memoryview(pdf_bytes)
+        for start in range(0, len(view), PDF_STREAM_CHUNK_BYTES):
+            yield bytes(view[start:start + PDF_STREAM_CHUNK_BYTES])
+    response = Response(chunks(), mimetype="application/pdf")
+    response.headers["Content-Length"] = str(len(pdf_bytes))
+    response.headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
+
+def profiled(view):
+    """Run the view under cProfile when PROFILE_ALL is on or an admin sends X-Profile-Token."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        admin = is_admin(request.headers.get("X-Profile-Token"))
+        if not (PROFILE_ALL or admin):
+            return view(*args, **kwargs)
+        memory = PROFILE_MEMORY or (admin and request.headers.get("X-Profile-Memory") == "1")
+        with profile_request(request_id_var.get(), request.path, memory) as profiling:
+            response = app.make_response(view(*args, **kwargs))
+        response.headers["X-Profile"] = "saved" if profiling else "busy"
+        return response
+    return wrapper
 
 @app.route('/generate-confirmation', methods=['POST'])
+@profiled
 def generate_confirmation():
     try:
-        print(f"Received request to /generate-confirmation")
         # Count API calls
         api_call_number = increment_counter()
-        print(f"API call count: {api_call_number}")
-        
-        # Log request data for debugging
-        print(f"Request headers: {dict(request.headers)}")
         data = request.get_json(force=True)
-        print(f"Request data received: {data}")
-
-        customer_name = data['customer_name']
-        order_id = data['order_id']
-        email = data['email']
-        shipping_address = data['shipping_address']
-        billing_address = data['billing_address']
-        cushions = data['cushions']
-
-        filename = f"confirmation_{uuid.uuid4().hex}.pdf"
-        filepath = os.path.join(PDF_DIR, filename)
-        # Generate initial single-cushion-per-page PDF, then 2-up it into final filepath
-        raw_filename = f"raw_{uuid.uuid4().hex}.pdf"
-        raw_filepath = os.path.join(PDF_DIR, raw_filename)
-
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.units import inch
-        c = canvas.Canvas(raw_filepath, pagesize=letter)
-        page_width, page_height = letter
-
-        # Page 1 - Customer Info
-   # Page 1 - Customer Info
-        c.setFont("Helvetica-Bold", 20)
-        c.drawString(1 * inch, page_height - 1 * inch, "ORDER CONFIRMATION")
-        y_left = page_height - 1.6 * inch
-        details = [
-            ("Customer Name", customer_name),
-            ("Order Number", order_id),
-            ("Email", email),
-            ("Shipping Address", "")
-        ] + [("", line) for line in shipping_address] + [
-            ("Billing Address", "")
-        ] + [("", line) for line in billing_address]
-
-        for label, value in details:
-            if label:
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(1 * inch, y_left, f"{label}:")
-                c.setFont("Helvetica", 12)
-                c.drawString(2.8 * inch, y_left, value)
-            elif value:
-                c.setFont("Helvetica", 12)
-                c.drawString(1.2 * inch, y_left, value)
-            y_left -= 0.25 * inch
-        # c.showPage()
-
-
-
-        print(f"Processing {len(cushions)} cushions...")
-        for i, cushion in enumerate(cushions):
-            print(f"Processing cushion {i+1}: {cushion.get('cushion_name', 'Unnamed')}")
-            if all(cushion.get(k, 0) > 0 for k in ("length", "top_width", "bottom_width", "ear", "thickness")):
-                if cushion.get("top_width") > cushion.get("bottom_width"):
-                    print(f"  Drawing T-shape cushion")
-                    draw_t_shape(c, cushion)
-                else:
-                    print(f"  Drawing L-shape cushion")
-                    draw_l_shape(c, cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("diameter", "thickness")):
-                name = cushion.get("cushion_name", "").lower()
-                if "semi" in name:
-                    draw_semi_round(c, cushion)
-                else:
-                    draw_round(c, cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("front_width_straight", "back_width_straight","thickness","front_width_curved","back_width_curved")):
-                draw_curved_cushion(c,cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("top_thickness", "bottom_thickness","height","length")):
-                draw_tapered_bolster(c,cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("width", "side_length","middle_length")):
-                draw_curved(c,cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("side", "thickness")):
-                draw_equilateral_triangle(c, cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("top_width", "bottom_width", "length")):
-                name = cushion.get("cushion_name", "").lower()
-                if "left" in name:
-                    draw_left_cushion(c, cushion)
-                else : 
-                    draw_right_cushion(c,cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("top_width", "bottom_width", "height","edge")):
-                draw_clipped_trapeze(c,cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("top_base", "bottom_base", "height")):
-                draw_trapezium(c, cushion)
-            elif all(cushion.get(k, 0) > 0 for k in ("width", "length", "thickness")):
-                name = cushion.get("cushion_name", "").lower()
-                if "triangle" in name:
-                    draw_right_triangle(c, cushion)
-                else: 
-                    draw_rectangle(c, cushion)
-            else:
-                raise ValueError("Unable to determine cushion shape. Missing key dimensions.")
-        # Finish raw PDF and then produce a 2-up final PDF (two cushions per page)
-        c.save()
+        logger.info("generate-confirmation request", extra={"fields": {
+            "api_call": api_call_number, "order_id": data.get("order_id"),
+            "cushions": len(data.get("cushions") or [])}})
+        log_payload(logger, dict(request.headers), data)
+        CUSHIONS_PER_ORDER.observe(len(data.get("cushions") or []))
+
+        render_mode = request.args.get("render_mode", RENDER_MODE)
+        if render_mode not in RENDER_MODES:
+            return jsonify({"error": f"Unknown render_mode: {render_mode}"}), 400
+
+        # Identical orders (retries, CS regenerations) reuse the file already rendered
+        doc_key = order_cache_key(data, render_mode) if DOCUMENT_CACHE.enabled else None
+        pdf_response = wants_pdf_response()
+        async_job = request.args.get("async") == "1" or "respond-async" in request.headers.get("Prefer", "")
+        if pdf_response and async_job:
+            return jsonify({"error": "async jobs answer with a job id; drop async or ask for a JSON response"}), 400
+        cached_path = DOCUMENT_CACHE.get(doc_key) if doc_key else None
+        if cached_path is not None and pdf_response:
+            logger.info("returning cached PDF bytes", extra={"fields": {"filename": os.path.basename(cached_path)}})
+            response = send_file(cached_path, mimetype="application/pdf",
+                                 download_name=os.path.basename(cached_path))
+            response.headers["X-Document-Cache"] = "hit"
+            return response
+        if cached_path is not None:
+            filename = os.path.basename(cached_path)
+            pdf_url = url_for('serve_pdf', filename=filename, _external=True)
+            logger.info("returning cached PDF", extra={"fields": {"filename": filename}})
+            response = jsonify({"pdf_link": pdf_url})
+            response.headers["X-Document-Cache"] = "hit"
+            response.headers["X-Disk-IO-Bytes"] = "0"
+            return response
+
+        in_memory = request.args.get("in_memory", "1" if PDF_IN_MEMORY else "0") == "1"
+
+        # PDF response mode: render in memory and return the bytes themselves;
+        # nothing is written to PDF_DIR unless the caller asks with ?persist=1
+        if pdf_response:
+            filename = new_pdf_name()
+            io_stats = {"disk_bytes_written": 0, "disk_bytes_read": 0}
+            pdf_buffer = io.BytesIO()
+            build_confirmation_pdf(data, pdf_buffer, mode=render_mode, stats=io_stats)
+            pdf_bytes = pdf_buffer.getbuffer()
+            persist = request.args.get("persist") == "1"
+            if persist:
+                _, filepath = new_pdf_path(filename)
+                save_pdf_bytes(filepath, pdf_bytes, io_stats)
+                register_pdf(filepath, pdf_bytes)
+                if doc_key:
+                    DOCUMENT_CACHE.put(doc_key, filepath)
+            logger.info("returning PDF bytes", extra={"fields": {
+                "filename": filename, "bytes": len(pdf_bytes),
+                "hidden_ops_stripped": io_stats.get("hidden_ops_stripped", 0)}})
+            response = stream_pdf(pdf_bytes, filename)
+            if persist:
+                response.headers["X-PDF-Link"] = url_for('serve_pdf', filename=filename, _external=True)
+            response.headers["X-Disk-IO-Bytes"] = str(io_stats["disk_bytes_written"] + io_stats["disk_bytes_read"])
+            response.headers["X-Document-Cache"] = "miss" if doc_key else "off"
+            return response
+
+        filename, filepath = new_pdf_path()
+
+        # Async mode: hand the render to the worker pool and answer with a job id
+        if async_job:
+            try:
+                job_id, future = submit_job(data, filepath, render_mode, in_memory, PDF_DIR)
+            except QueueFullError as e:
+                return jsonify({"error": str(e)}), 503
+            if doc_key:
+                future.add_done_callback(
+                    lambda f: f.exception() is None and DOCUMENT_CACHE.put(doc_key, filepath))
+            logger.info("queued render job", extra={"fields": {"job_id": job_id}})
+            status_url = url_for('job_status', job_id=job_id, _external=True)
+            return jsonify({"job_id": job_id, "status_url": status_url}), 202
+
+        io_stats = {"disk_bytes_written": 0, "disk_bytes_read": 0}
+        pdf_bytes = None
+        if in_memory:
+            pdf_buffer = io.BytesIO()
+            build_confirmation_pdf(data, pdf_buffer, mode=render_mode, stats=io_stats)
+            pdf_bytes = pdf_buffer.getvalue()
+            save_pdf_bytes(filepath, pdf_bytes, io_stats)
+        else:
+            build_confirmation_pdf(data, filepath, mode=render_mode, work_dir=PDF_DIR, stats=io_stats)
+        register_pdf(filepath, pdf_bytes)
+        disk_io_bytes = io_stats["disk_bytes_written"] + io_stats["disk_bytes_read"]
+        if doc_key:
+            DOCUMENT_CACHE.put(doc_key, filepath)
 
-        try:
-            reader = PdfReader(raw_filepath)
-            writer = PdfWriter()
-
-            # Keep the first page (customer info) as-is
-            if len(reader.pages) >= 1:
-                writer.add_page(reader.pages[0])
-
-            # Adaptive N-up (try 3-up to reduce whitespace, else 2-up)
-            W, H = letter
-            margin_x = 0.20 * 72  # ~0.20 inch for larger content
-            margin_y = 0.20 * 72
-
-            def compute_scale(slots):
-                sx = (W - 2 * margin_x) / W
-                sy = ((H - 2 * margin_y) / slots) / H
-                return min(sx, sy)
-
-            # Force two cushions per page so each new cushion starts at page top.
-            slots_per_page = 2
-
-            # Slot dimensions (target area for each cushion diagram)
-            slot_w = W - 2 * margin_x
-            slot_h = (H - 2 * margin_y) / slots_per_page
-
-            # Precompute slot top edges (top-down order) so first cushion starts at page top
-            slots_top_y = [H - margin_y - i * slot_h for i in range(slots_per_page)]
-
-            # Layout: specs on left, diagram on right with a small gutter so they are close
-            text_ratio = 0.28
-            gutter_x = 0.18 * 72  # wider gap to keep text out of diagram
-            text_w = slot_w * text_ratio
-            diagram_w_target = slot_w - text_w - gutter_x
-
-            # Create base pages with specs in the left column for each slot
-            from reportlab.pdfgen import canvas as rl_canvas
-            from reportlab.lib.units import inch
-            base_filename = f"layout_{uuid.uuid4().hex}.pdf"
-            base_filepath = os.path.join(PDF_DIR, base_filename)
-            bc = rl_canvas.Canvas(base_filepath, pagesize=letter)
-
-            def _derive_shape_label(cushion):
-                try:
-                    # Clipped trapeze first (has explicit edge)
-                    if all(float(cushion.get(k, 0)) > 0 for k in ("top_width", "bottom_width", "height")) and cushion.get("edge") not in (None, "", 0, "0"):
-                        return "Clipped Trapeze"
-                    if all(float(cushion.get(k, 0)) > 0 for k in ("top_base", "bottom_base", "height")):
-                        return "Trapezoid"
-                    if all(float(cushion.get(k, 0)) > 0 for k in ("length", "top_width", "bottom_width", "ear", "thickness")):
-                        return "T-Shape" if cushion.get("top_width") > cushion.get("bottom_width") else "L-Shape"
-                    if all(float(cushion.get(k, 0)) > 0 for k in ("diameter", "thickness")):
-                        return "Round"
-                except Exception:
-                    pass
-                return None
-
-            def _thickness_value(cushion):
-                # Try common keys for thickness across shapes
-                for key in ("thickness", "thickness_in", "top_thickness", "bottom_thickness"):
-                    if key in cushion and cushion[key] not in (None, ""):
+        pdf_url = url_for('serve_pdf', filename=filename, _external=True)
+        logger.info("PDF generated", extra={"fields": {
+            "filename": filename, "pdf_url": pdf_url, "render_mode": render_mode,
+            "bytes": len(pdf_bytes) if pdf_bytes is not None else os.path.getsize(filepath),
+            "hidden_ops_stripped": io_stats.get("hidden_ops_stripped", 0),
+            "disk_bytes_written": io_stats["disk_bytes_written"], "disk_bytes_read": io_stats["disk_bytes_read"]}})
+        response = jsonify({"pdf_link": pdf_url})
+        response.headers["X-Disk-IO-Bytes"] = str(disk_io_bytes)
+        response.headers["X-Document-Cache"] = "miss" if doc_key else "off"
+        return response
+
+    except Exception as e:
+        logger.exception("request failed")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/generate-confirmations/batch', methods=['POST'])
+def generate_confirmations_batch():
+    try:
+        api_call_number = increment_counter()
+
+        body = request.get_json(force=True)
+        orders = body.get("orders") if isinstance(body, dict) else body
+        if not isinstance(orders, list) or not orders:
+            return jsonify({"error": "Expected a non-empty list of orders"}), 400
+        if len(orders) > BATCH_MAX_ORDERS:
+            return jsonify({"error": f"At most {BATCH_MAX_ORDERS} orders per batch"}), 400
+
+        render_mode = request.args.get("render_mode", RENDER_MODE)
+        if render_mode not in RENDER_MODES:
+            return jsonify({"error": f"Unknown render_mode: {render_mode}"}), 400
+        as_zip = request.args.get("response") == "zip" or (
+            request.accept_mimetypes.best_match(["application/json", "application/zip"]) == "application/zip")
+
+        # Results are keyed by order_id; missing or repeated ids fall back to the position
+        names = []
+        for i, data in enumerate(orders):
+            order_id = data.get("order_id") if isinstance(data, dict) else None
+            name = str(order_id) if order_id not in (None, "") else f"#{i}"
+            names.append(name if name not in names else f"{name}#{i}")
+
+        # Orders already rendered are answered from the document cache
+        doc_keys = [None] * len(orders)
+        cached = {}
+        cached_bytes = {}
+        if DOCUMENT_CACHE.enabled:
+            for i, data in enumerate(orders):
+                if isinstance(data, dict):
+                    doc_keys[i] = order_cache_key(data, render_mode)
+                    cached_path = DOCUMENT_CACHE.get(doc_keys[i])
+                    if cached_path is not None and as_zip:
+                        # Read it now; the evictor may remove it while the rest renders
                         try:
-                            val = float(cushion[key])
-                            return f"{val:g}\""
-                        except Exception:
-                            return str(cushion[key])
-                return None
-
-            def _draw_wrapped_kv(cnv, x, y, label, value, max_width):
-                from reportlab.pdfbase.pdfmetrics import stringWidth
-                label_text = f"{label} : "
-                font_label = ("Helvetica-Bold", 12)
-                font_value = ("Helvetica", 12)
-                line_height = 0.20 * 72
-
-                # Measure label width
-                label_w = stringWidth(label_text, font_label[0], font_label[1])
-                value_w_max = max_width - label_w
-
-                # Split value into words and wrap
-                words = str(value).split()
-                line = ""
-
-                cnv.setFont(*font_label)
-                cnv.drawString(x, y, label_text)
-                cnv.setFont(*font_value)
-
-                def draw_value_line(text, yy):
-                    # Draw the wrapped value line; width control handled by pre-wrap calculation
-                    cnv.drawString(x + label_w, yy, text)
-
-                for word in words:
-                    test = (line + " " + word).strip()
-                    if stringWidth(test, font_value[0], font_value[1]) <= value_w_max:
-                        line = test
+                            with open(cached_path, "rb") as f_in:
+                                cached_bytes[i] = f_in.read()
+                        except FileNotFoundError:
+                            cached_path = None
+                    if cached_path is not None:
+                        cached[i] = cached_path
+        pending = [i for i in range(len(orders)) if i not in cached]
+        logger.info("batch request", extra={"fields": {
+            "api_call": api_call_number, "orders": len(orders), "cached": len(cached)}})
+        try:
+            rendered = dict(zip(pending, render_batch([orders[i] for i in pending], render_mode)))
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 503
+
+        results = {}
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) if as_zip else contextlib.nullcontext() as archive:
+            for i, name in enumerate(names):
+                if i in cached:
+                    if as_zip:
+                        archive.writestr(f"confirmation_{name}.pdf", cached_bytes[i])
                     else:
-                        draw_value_line(line, y)
-                        y -= line_height
-                        line = word
-                if line:
-                    draw_value_line(line, y)
-                    y -= line_height
-
-                return y - 4  # extra spacing between rows
-
-            def draw_specs_block(cnv, cushion, slot_top_y):
-                x = margin_x
-                y = slot_top_y - 0.15 * inch
-                cnv.setFont("Helvetica-Bold", 14)
-
-                shape_label = _derive_shape_label(cushion)
-
-                # For Trapezoid, print the exact ordered block requested
-                if shape_label == "Trapezoid":
-                    fields_order = [
-                        ("__shape__", "Shape"),
-                        ("top_base", "Top Base"),
-                        ("bottom_base", "Bottom Base"),
-                        ("height", "Height"),
-                        ("thickness", "Thickness"),
-                        ("zipper", "Zipper Position"),
-                        ("piping", "Piping"),
-                        ("ties", "Ties"),
-                        ("quantity", "Quantity"),
-                        ("fill", "Fill"),
-                        ("fabric", "Fabric"),
-                    ]
+                        results[name] = {"pdf_link": url_for('serve_pdf', filename=os.path.basename(cached[i]), _external=True)}
+                    continue
+                pdf_bytes, error = rendered[i]
+                if isinstance(orders[i], dict):
+                    CUSHIONS_PER_ORDER.observe(len(orders[i].get("cushions") or []))
+                if error is not None:
+                    logger.warning("batch order failed", extra={"fields": {"order": name, "error": error}})
+                    ERRORS.inc(endpoint="batch_order")
+                    results[name] = {"error": error}
+                elif as_zip:
+                    archive.writestr(f"confirmation_{name}.pdf", pdf_bytes)
                 else:
-                    # Generic fallback (hide zeros), include zipper
-                    fields_order = [
-                        ("__shape__", "Shape"),
-                        ("length", "Length"),
-                        ("width", "Width"),
-                        ("bottom_width", "Bottom Width"),
-                        ("top_width", "Top Width"),
-                        ("ear", "Ear"),
-                        ("height", "Height"),
-                        ("side", "Side"),
-                        ("side_length", "Side Length"),
-                        ("middle_length", "Middle Length"),
-                        ("diameter", "Diameter"),
-                        ("top_base", "Top Base"),
-                        ("bottom_base", "Bottom Base"),
-                        ("edge", "Clipping Edge"),
-                        ("top_thickness", "Top Thickness"),
-                        ("bottom_thickness", "Bottom Thickness"),
-                        ("thickness", "Thickness"),
-                        ("zipper", "Zipper Position"),
-                        ("piping", "Piping"),
-                        ("ties", "Ties"),
-                        ("quantity", "Quantity"),
-                        ("fill", "Fill"),
-                        ("fabric", "Fabric"),
-                    ]
-
-                for key, label in fields_order:
-                    if key not in cushion:
-                        if key == "__shape__":
-                            val = shape_label or cushion.get("cushion_name", "")
-                        else:
-                            continue
-                    else:
-                        val = cushion[key]
-                    # Skip empty or zero values
-                    if val is None:
-                        continue
-                    try:
-                        if isinstance(val, (int, float)) and float(val) == 0:
-                            continue
-                        if isinstance(val, str) and val.strip() == "0":
-                            continue
-                    except Exception:
-                        pass
-                    # Ensure long Fabric stays in left column, not diagram
-                    y = _draw_wrapped_kv(cnv, x, y, label, val, text_w - 2)
-
-            # Build base pages
-            total = len(cushions)
-            page_count = (total + slots_per_page - 1) // slots_per_page
-            for p in range(page_count):
-                for si in range(slots_per_page):
-                    idx = p * slots_per_page + si
-                    if idx >= total:
-                        break
-                    # Top y for this slot (top-down)
-                    slot_top_y = slots_top_y[si]
-                    draw_specs_block(bc, cushions[idx], slot_top_y)
-
-                    # Thickness label is rendered inside each drawer; do not overlay to avoid duplicates
-                bc.showPage()
-            bc.save()
-
-            base_reader = PdfReader(base_filepath)
-
-            # Process cushion pages starting from index 1 (skip cover) and compose onto base pages
-            cushion_pages = reader.pages[1:]
-            for p in range(page_count):
-                new_page = writer.add_page(base_reader.pages[p])
-                for si in range(slots_per_page):
-                    pi = p * slots_per_page + si
-                    if pi >= len(cushion_pages):
-                        break
-                    src_page = cushion_pages[pi]
-
-                    # Trim source page to remove the drawer's own header/specs.
-                    # Use tighter crops for trapezoid pages to maximize diagram size.
-                    current_cushion = cushions[pi] if pi < len(cushions) else {}
-                    shape_lbl = _derive_shape_label(current_cushion)
-
-                    if shape_lbl == "Trapezoid":
-                        # Trim more on the left to remove stray partial thickness text (e.g., just '3')
-                        left_trim   = 0.95 * 72
-                        right_trim  = 0.70 * 72
-                        bottom_trim = 0.25 * 72
-                        top_trim    = H * 0.60
-                    else:
-                        side_trim_in = 0.40
-                        left_trim   = side_trim_in * 72
-                        right_trim  = side_trim_in * 72
-                        bottom_trim = side_trim_in * 72
-                        top_trim    = H * 0.45
-
-                    try:
-                        src_page.cropbox.lower_left  = (left_trim, bottom_trim)
-                        src_page.cropbox.upper_right = (W - right_trim, H - top_trim)
-                    except Exception:
-                        pass
-
-                    visible_w = W - left_trim - right_trim
-                    visible_h = H - top_trim - bottom_trim
-
-                    # Scale to fit the diagram region on the right side
-                    s_local = min(diagram_w_target / visible_w, slot_h / visible_h)
-
-                    # Place diagram flush against the text column with a small gutter,
-                    # top-aligned to the slot so it stays parallel with details.
-                    right_x0 = margin_x + text_w + gutter_x
-                    tx = right_x0 - s_local * left_trim
-                    top_pad = 0.10 * 72  # ~0.10 inch
-                    slot_top_y = slots_top_y[si]
-                    # Inner safety padding to ensure labels like thickness don’t touch slot edges
-                    inner_pad_top = 0.06 * 72
-                    inner_pad_bottom = 0.06 * 72
-                    ty = (
-                        slot_top_y
-                        - top_pad
-                        - inner_pad_top
-                        - (s_local * visible_h)
-                        - s_local * bottom_trim
-                        + inner_pad_bottom
-                    )
-
-                    t = Transformation().scale(s_local).translate(tx, ty)
-                    new_page.merge_transformed_page(src_page, t)
-
-            # cleanup base layout file
-            try:
-                os.remove(base_filepath)
-            except Exception:
-                pass
-
-            with open(filepath, "wb") as f_out:
-                writer.write(f_out)
-        finally:
-            # Cleanup raw file
-            try:
-                os.remove(raw_filepath)
-            except Exception:
-                pass
-
-        pdf_url = url_for('serve_pdf', filename=filename, _external=True)
-        print(f"PDF generated successfully: {filename}")
-        print(f"PDF URL: {pdf_url}")
-        return jsonify({"pdf_link": pdf_url})
+                    filename, filepath = new_pdf_path()
+                    save_pdf_bytes(filepath, pdf_bytes)
+                    register_pdf(filepath, pdf_bytes)
+                    if doc_keys[i]:
+                        DOCUMENT_CACHE.put(doc_keys[i], filepath)
+                    results[name] = {"pdf_link": url_for('serve_pdf', filename=filename, _external=True)}
+            if as_zip and results:
+                archive.writestr("errors.json", json.dumps(results, indent=2))
+
+        failed = sum(1 for r in results.values() if "error" in r)
+        logger.info("batch finished", extra={"fields": {"ok": len(orders) - failed, "failed": failed}})
+        if as_zip:
+            response = Response(zip_buffer.getvalue(), mimetype="application/zip")
+            response.headers["Content-Disposition"] = 'attachment; filename="confirmations.zip"'
+        else:
+            response = jsonify({"results": results})
+        response.headers["X-Batch-Failed"] = str(failed)
+        return response
 
     except Exception as e:
-        import sys
-        print("ERROR:", e, file=sys.stderr)
+        logger.exception("request failed")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    body = {"job_id": job["id"], "state": job["state"]}
+    if job["state"] == "done":
+        body["pdf_link"] = url_for('serve_pdf', filename=job["filename"], _external=True)
+    elif job["state"] == "failed":
+        body["error"] = job["error"]
+    return jsonify(body)
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/profiles')
+def profiles():
+    # Admin only: with a token configured it must be sent, without one the
+    # listing is there only while PROFILE_ALL is on
+    if PROFILE_TOKEN:
+        if not is_admin(request.headers.get("X-Profile-Token")):
+            return jsonify({"error": "Forbidden"}), 403
+    elif not PROFILE_ALL:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    limit = request.args.get("limit", 20, type=int)
+    return jsonify({"profiles": list_profiles(limit)})
+
 @app.route('/pdfs/<filename>')
 def serve_pdf(filename):
-    return send_from_directory(PDF_DIR, filename)
+    resolved = resolve_pdf(filename)
+    if resolved is None:
+        return jsonify({"error": "PDF not found"}), 404
+    filepath, etag = resolved
+    # conditional=True answers If-None-Match with 304 and Range with 206; a path
+    # (not a file object) lets the server use sendfile via wsgi.file_wrapper
+    response = send_file(filepath, mimetype="application/pdf", etag=etag, conditional=True,
+                         max_age=PDF_CACHE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
+
+INDEX_PAGE = IndexPage()
 
 @app.route('/')
 def index():
-    return render_template_string(open("form.html").read())
+    bodies, etag = INDEX_PAGE.get(app.jinja_env, reload=app.debug)
+    encoding = request.accept_encodings.best_match([e for e in ("br", "gzip") if e in bodies]) or "identity"
+    # Each encoding is a different representation, so it gets its own strong ETag
+    if encoding != "identity":
+        etag = f"{etag}-{encoding}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(bodies[encoding], mimetype="text/html")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 10000))
@@ -0,0 +1,41 @@
+import functools
+import math
+
+try:
+    import numpy
+except ImportError:  # optional; plain lists give the same points
+    numpy = None
+
+
+@functools.lru_cache(maxsize=32)
+def unit_arc(points, start=0.0, extent=math.pi / 2):
+    """(cos, sin) of ``points`` angles spaced evenly from start to start + extent.
+
+    Computed once per arc and shared by every radius drawn along it.
+    """
+    angles = [start + extent * i / (points - 1) for i in range(points)]
+    if numpy is not None:
+        angles = numpy.array(angles)
+        return numpy.cos(angles), numpy.sin(angles)
+    return tuple(math.cos(t) for t in angles), tuple(math.sin(t) for t in angles)
+
+
+def arc_points(center_x, center_y, radius, points, start=0.0, extent=math.pi / 2):
+    """Return (xs, ys): ``points`` samples on the arc of ``radius`` around the center."""
+    cos_t, sin_t = unit_arc(points, start, extent)
+    if numpy is not None:
+        return (center_x + radius * cos_t).tolist(), (center_y + radius * sin_t).tolist()
+    return [center_x + radius * c for c in cos_t], [center_y + radius * s for s in sin_t]
+
+
+def arc_samples(center_x, center_y, radius, points, indices, start=0.0, extent=math.pi / 2):
+    """The arc_points samples at ``indices`` only, as ({index: x}, {index: y}).
+
+    For arcs stroked as curves, where only a few points on them are needed.
+    """
+    xs, ys = {}, {}
+    for i in indices:
+        t = start + extent * (i % points) / (points - 1)
+        xs[i] = center_x + radius * math.cos(t)
+        ys[i] = center_y + radius * math.sin(t)
+    return xs, ys
@@ -0,0 +1,83 @@
+"""Recorded diagrams never carry one customer's text into another's PDF.
+
+For seeded cushions of every shape (see benchmarks.orders), builds a twin
+that differs only in cushion name, quantity and free-text spec values
+(fill, fabric), all short enough to wrap the same way. Under every
+DIAGRAM_ONLY and STRIP_HIDDEN_CONTENT setting the two must get different
+diagram cache keys, or share a recording that holds none of those values.
+Also reports how many twins share a recording, i.e. how much the cache
+still saves.
+
+Run from the repository root:
+    python -m benchmarks.diagram_key_check [--cushions 5] [--seed 0]
+Exits with status 1 when any shared recording leaks customer text.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import confirmation_pdf  # noqa: E402
+from confirmation_pdf import FREE_TEXT_KEYS, _cache_key, diagram_key, record_diagram  # noqa: E402
+from benchmarks.orders import SHAPE_NAMES, generate_cushion  # noqa: E402
+
+
+def _twins(cushion, index):
+    """Copies of ``cushion`` whose customer text is marked "Left"/"Right"."""
+    pair = []
+    for side in ("Left", "Right"):
+        twin = dict(cushion, cushion_name=f"{side} Name {index}", quantity=len(pair) + 1)
+        for k in FREE_TEXT_KEYS:
+            if k in cushion:
+                twin[k] = f"{side} {k} {index}"
+        pair.append(twin)
+    return pair
+
+
+def _customer_text(twin):
+    return [twin["cushion_name"]] + [twin[k] for k in FREE_TEXT_KEYS if k in twin]
+
+
+def _recorded_text(ops):
+    return " ".join(str(arg) for _, args, _ in ops for arg in args if isinstance(arg, str))
+
+
+def run(cushions=5, seed=0):
+    rng = random.Random(seed)
+    samples = [generate_cushion(rng, shape) for shape in SHAPE_NAMES for _ in range(cushions)]
+    settings = (confirmation_pdf.DIAGRAM_ONLY, confirmation_pdf.STRIP_HIDDEN_CONTENT)
+    report = []
+    try:
+        for diagram_only, strip in itertools.product((True, False), repeat=2):
+            confirmation_pdf.DIAGRAM_ONLY = diagram_only
+            confirmation_pdf.STRIP_HIDDEN_CONTENT = strip
+            shared, leaks = 0, []
+            for i, cushion in enumerate(samples):
+                left, right = _twins(cushion, i)
+                if _cache_key(diagram_key(left)) != _cache_key(diagram_key(right)):
+                    continue
+                shared += 1
+                text = _recorded_text(record_diagram(left))
+                found = [value for value in _customer_text(left) if value in text]
+                if found:
+                    leaks.append({"cushion_name": cushion["cushion_name"], "leaked": found})
+            report.append({"diagram_only": diagram_only, "strip_hidden_content": strip,
+                           "pairs": len(samples), "shared_recordings": shared, "leaks": leaks})
+    finally:
+        confirmation_pdf.DIAGRAM_ONLY, confirmation_pdf.STRIP_HIDDEN_CONTENT = settings
+    return {"seed": seed, "settings": report}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cushions", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    report = run(args.cushions, args.seed)
+    print(json.dumps(report, indent=2))
+    if any(setting["leaks"] for setting in report["settings"]):
+        sys.exit(1)
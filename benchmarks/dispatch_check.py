@@ -0,0 +1,96 @@
+"""shape_registry picks the same drawer the old if/elif dispatch did.
+
+Starts from seeded cushions of every shape (see benchmarks.orders), drops,
+zeroes, negates or adds random dimensions so shape families overlap and
+fall through, renames them with and without the words the old chain looked
+for, and compares resolve_shape with a frozen copy of that chain, including
+which cushions it refused.
+
+Run from the repository root:
+    python -m benchmarks.dispatch_check [--cushions 20000] [--seed 0]
+Exits with status 1 when any cushion dispatches differently.
+"""
+import argparse
+import json
+import random
+import sys
+
+from shape_registry import DIMENSION_KEYS, resolve_shape
+from benchmarks.orders import SHAPE_NAMES, generate_cushion
+
+NAMES = ("Bench", "Semi Round Seat", "Left Window", "Right Arm", "Corner Triangle", "semi-left triangle", "")
+
+
+def legacy_drawer(cushion):
+    """resolve_drawer() as it stood before shape_registry, by drawer name."""
+    def has(*keys):
+        return all(cushion.get(k, 0) > 0 for k in keys)
+
+    name = cushion.get("cushion_name", "").lower()
+    if has("length", "top_width", "bottom_width", "ear", "thickness"):
+        return "draw_t_shape" if cushion.get("top_width") > cushion.get("bottom_width") else "draw_l_shape"
+    elif has("diameter", "thickness"):
+        return "draw_semi_round" if "semi" in name else "draw_round"
+    elif has("front_width_straight", "back_width_straight", "thickness", "front_width_curved", "back_width_curved"):
+        return "draw_curved_cushion"
+    elif has("top_thickness", "bottom_thickness", "height", "length"):
+        return "draw_tapered_bolster"
+    elif has("width", "side_length", "middle_length"):
+        return "draw_curved"
+    elif has("side", "thickness"):
+        return "draw_equilateral_triangle"
+    elif has("top_width", "bottom_width", "length"):
+        return "draw_left_cushion" if "left" in name else "draw_right_cushion"
+    elif has("top_width", "bottom_width", "height", "edge"):
+        return "draw_clipped_trapeze"
+    elif has("top_base", "bottom_base", "height"):
+        return "draw_trapezium"
+    elif has("width", "length", "thickness"):
+        return "draw_right_triangle" if "triangle" in name else "draw_rectangle"
+    return None
+
+
+def _random_cushion(rng):
+    cushion = generate_cushion(rng, rng.choice(SHAPE_NAMES))
+    cushion["cushion_name"] = rng.choice(NAMES)
+    for key in sorted(DIMENSION_KEYS):
+        if rng.random() < 0.15:
+            cushion[key] = rng.choice((0, -1, rng.uniform(0.5, 80), rng.randint(1, 80)))
+        elif key in cushion and rng.random() < 0.05:
+            del cushion[key]
+    return cushion
+
+
+def _current_drawer(cushion):
+    try:
+        return resolve_shape(cushion).function
+    except ValueError:
+        return None
+
+
+def run(cushions=20000, seed=0):
+    rng = random.Random(seed)
+    mismatches = []
+    mismatched = 0
+    dispatched = {}
+    for _ in range(cushions):
+        cushion = _random_cushion(rng)
+        expected, actual = legacy_drawer(cushion), _current_drawer(cushion)
+        dispatched[str(expected)] = dispatched.get(str(expected), 0) + 1
+        if expected != actual:
+            mismatched += 1
+            if len(mismatches) < 20:
+                mismatches.append({"cushion": cushion, "legacy": expected, "registry": actual})
+    return {"seed": seed, "cushions": cushions, "legacy_dispatch": dispatched,
+            "mismatched": mismatched, "mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cushions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    report = run(args.cushions, args.seed)
+    print(json.dumps(report, indent=2))
+    if report["mismatches"]:
+        sys.exit(1)
@@ -0,0 +1,83 @@
+"""PDF operators and content bytes each drawer emits per cushion.
+
+Draws seeded cushions of every shape (see benchmarks.orders) on their own
+full, uncompressed page and counts the operators in the page content
+stream, the strokes among them and the stream size, with drawer latency
+percentiles.
+
+Run from the repository root:
+    python -m benchmarks.drawer_ops_bench [--cushions 20] [--seed 0] [--max-ops 450]
+Exits with status 1 when any cushion's page exceeds the operator budget.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from pypdf import PdfReader  # noqa: E402
+from pypdf.generic import ContentStream  # noqa: E402
+from reportlab.lib.pagesizes import letter  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from shape_registry import resolve_shape  # noqa: E402
+from benchmarks.orders import SHAPE_NAMES, generate_cushion  # noqa: E402
+from benchmarks.stats import percentiles  # noqa: E402
+
+# Operators that stroke a path
+STROKE_OPS = (b"S", b"s", b"B", b"B*", b"b", b"b*")
+
+
+def _page_ops(cushion):
+    out = io.BytesIO()
+    c = canvas.Canvas(out, pagesize=letter, pageCompression=0)
+    started = time.perf_counter()
+    resolve_shape(cushion).drawer(c, cushion)
+    elapsed = time.perf_counter() - started
+    c.save()
+    reader = PdfReader(io.BytesIO(out.getvalue()))
+    page = reader.pages[0]
+    content = page.get_contents()
+    operations = ContentStream(content, reader).operations
+    strokes = sum(1 for _, op in operations if op in STROKE_OPS)
+    return len(operations), strokes, len(content.get_data()), elapsed
+
+
+def run(cushions=20, seed=0):
+    rng = random.Random(seed)
+    shapes = {}
+    for shape in SHAPE_NAMES:
+        ops, strokes, sizes, times = [], [], [], []
+        for _ in range(cushions):
+            n_ops, n_strokes, size, elapsed = _page_ops(generate_cushion(rng, shape))
+            ops.append(n_ops)
+            strokes.append(n_strokes)
+            sizes.append(size)
+            times.append(elapsed)
+        shapes[shape] = {
+            "ops_mean": round(sum(ops) / len(ops), 1),
+            "ops_max": max(ops),
+            "strokes_mean": round(sum(strokes) / len(strokes), 1),
+            "content_bytes_mean": round(sum(sizes) / len(sizes)),
+            "drawer": percentiles(times),
+        }
+    return {"seed": seed, "cushions_per_shape": cushions, "shapes": shapes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cushions", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ops", type=int, default=None)
+    args = parser.parse_args()
+    report = run(args.cushions, args.seed)
+    if args.max_ops is not None:
+        report["max_ops"] = args.max_ops
+        report["over_budget"] = sorted(s for s, r in report["shapes"].items() if r["ops_max"] > args.max_ops)
+    print(json.dumps(report, indent=2))
+    if args.max_ops is not None and report["over_budget"]:
+        sys.exit(1)
@@ -0,0 +1,61 @@
+"""Size of each confirmation with and without the content the crop hides.
+
+Renders the same seeded orders with STRIP_HIDDEN_CONTENT off and on, in each
+render mode, and reports per order the PDF bytes both ways, the drawer calls
+dropped and the saving.
+
+Run from the repository root:
+    python -m benchmarks.hidden_content_bench [--sizes 14,50] [--orders 3] [--seed 0]
+"""
+import argparse
+import io
+import json
+import os
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import confirmation_pdf  # noqa: E402
+from confirmation_pdf import DIAGRAM_CACHE, RENDER_MODES, build_confirmation_pdf  # noqa: E402
+from benchmarks.orders import generate_order  # noqa: E402
+
+
+def _render(order, render_mode, strip):
+    confirmation_pdf.STRIP_HIDDEN_CONTENT = strip
+    DIAGRAM_CACHE.clear()
+    stats = {}
+    out = io.BytesIO()
+    build_confirmation_pdf(order, out, mode=render_mode, stats=stats)
+    return out.tell(), stats.get("hidden_ops_stripped", 0)
+
+
+def run(sizes=(14, 50), orders=3, seed=0):
+    strip_setting = confirmation_pdf.STRIP_HIDDEN_CONTENT
+    report = []
+    try:
+        for size in sizes:
+            for i in range(orders):
+                order = generate_order(size, seed + i)
+                for render_mode in RENDER_MODES:
+                    full_bytes, _ = _render(order, render_mode, False)
+                    stripped_bytes, ops = _render(order, render_mode, True)
+                    report.append({
+                        "order_id": order["order_id"],
+                        "cushions": size,
+                        "render_mode": render_mode,
+                        "full_bytes": full_bytes,
+                        "stripped_bytes": stripped_bytes,
+                        "hidden_ops_stripped": ops,
+                        "saved_pct": round(100.0 * (1 - stripped_bytes / full_bytes), 1),
+                    })
+    finally:
+        confirmation_pdf.STRIP_HIDDEN_CONTENT = strip_setting
+    return {"seed": seed, "orders": report}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="14,50")
+    parser.add_argument("--orders", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(tuple(int(s) for s in args.sizes.split(",")), args.orders, args.seed), indent=2))
@@ -0,0 +1,59 @@
+"""Merge-mode composition: Form XObject placement vs merge_transformed_page.
+
+Builds the same seeded orders through build_merged_pdf with each
+MERGE_COMPOSITION and reports build and "merge" stage latency percentiles and
+output bytes per order size.
+
+Run from the repository root:
+    python -m benchmarks.merge_compose_bench [--sizes 10,50,200] [--iterations 3] [--seed 0]
+"""
+import argparse
+import io
+import json
+import os
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from confirmation_pdf import MERGE_COMPOSITIONS, build_merged_pdf  # noqa: E402
+from metrics import STAGE_SECONDS  # noqa: E402
+from benchmarks.orders import generate_order  # noqa: E402
+from benchmarks.stats import HistogramSamples, percentiles  # noqa: E402
+
+
+def run(sizes=(10, 50, 200), iterations=3, seed=0):
+    for composition in MERGE_COMPOSITIONS:
+        build_merged_pdf(generate_order(seed=seed - 1), io.BytesIO(), composition=composition)
+
+    runs = []
+    for size in sizes:
+        orders = [generate_order(size, seed + i) for i in range(iterations)]
+        result = {"cushions": size, "iterations": iterations}
+        for composition in MERGE_COMPOSITIONS:
+            builds, sizes_out = [], []
+            with HistogramSamples(STAGE_SECONDS, "stage") as stages:
+                for order in orders:
+                    out = io.BytesIO()
+                    started = time.perf_counter()
+                    build_merged_pdf(order, out, composition=composition)
+                    builds.append(time.perf_counter() - started)
+                    sizes_out.append(out.tell())
+            result[composition] = {
+                "build": percentiles(builds),
+                "merge_stage": percentiles(stages.values.get("merge", [])),
+                "write_stage": percentiles(stages.values.get("write", [])),
+                "pdf_bytes_mean": round(sum(sizes_out) / len(sizes_out)),
+            }
+        old, new = result["transform"]["merge_stage"], result["xobject"]["merge_stage"]
+        result["merge_stage_speedup"] = round(old["p50_ms"] / new["p50_ms"], 1) if new["p50_ms"] else None
+        runs.append(result)
+    return {"seed": seed, "runs": runs}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,50,200")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(tuple(int(s) for s in args.sizes.split(",")), args.iterations, args.seed), indent=2))
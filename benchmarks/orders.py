@@ -0,0 +1,172 @@
+"""Seeded synthetic orders covering every shape the dispatcher supports.
+
+Each shape draws its dimensions and options from ranges its drawer accepts,
+so the same seed always yields the same, valid payload:
+
+    from benchmarks.orders import generate_order
+    order = generate_order(cushions=50, seed=7)
+"""
+import random
+
+FILLS = ("Poly Fiber", "High Density Foam", "Dacron Wrapped Foam", "Quick Dry Foam")
+FABRICS = (
+    "Outdoor Canvas Sunbrella Spectrum Dove",
+    "Sunbrella Cast Ocean",
+    "Sunbrella Heritage Alloy Piped In Canvas Natural With Contrast Welt",
+    "Indoor Velvet Royal Navy",
+    "Phifertex Mesh Black",
+)
+PIPING = ("Yes", "No")
+
+
+def _in(rng, low, high, step=0.25):
+    """A value on a ``step`` grid between low and high."""
+    return round(rng.uniform(low, high) / step) * step
+
+
+def _t_or_l(rng, wide_top):
+    narrow, wide = _in(rng, 14, 22), _in(rng, 24, 34)
+    return {
+        "length": _in(rng, 30, 60), "top_width": wide if wide_top else narrow,
+        "bottom_width": narrow if wide_top else wide, "ear": _in(rng, 4, 10), "thickness": _in(rng, 2, 5, 0.5),
+    }
+
+
+# shape: (cushion names, dimensions and overrides, zipper options, tie options)
+SHAPE_SPECS = {
+    "rectangle": (
+        ("Bench", "Seat", "Chaise"),
+        lambda rng: {"length": _in(rng, 18, 80), "width": _in(rng, 14, 30), "thickness": _in(rng, 2, 6, 0.5)},
+        ("Long Side", "Short Side"),
+        ("None", "2 Side", "2 Side Long", "2 Same Side Long", "2 Corners", "4 Corners", "4 Side", "4 Short Sides"),
+    ),
+    "right_triangle": (
+        ("Corner Triangle", "Triangle Wedge"),
+        lambda rng: {"length": _in(rng, 14, 30), "width": _in(rng, 12, 26), "thickness": _in(rng, 2, 4, 0.5)},
+        ("Width", "Length", "Hypotenuse"),
+        ("None",),
+    ),
+    "trapezium": (
+        ("Bay Window", "Trapezoid Seat"),
+        lambda rng: {"top_base": _in(rng, 30, 60), "bottom_base": _in(rng, 70, 120), "height": _in(rng, 16, 30),
+                     "thickness": _in(rng, 2, 4, 0.5)},
+        ("Short Side", "Long Side", "Angled Side", "ShortPlusAngled"),
+        ("No Ties", "2 Side Ties", "2 Back Ties", "2 Corner Ties", "4 Corner Ties"),
+    ),
+    "t_shape": (
+        ("T Cushion", "Deep Seat T"),
+        lambda rng: _t_or_l(rng, wide_top=True),
+        ("Length", "Top Width", "Bottom Width", "Ear"),
+        ("No ties", "2 Corner ties", "4 Corner ties", "2 Side ties-along length"),
+    ),
+    "l_shape": (
+        ("L Cushion", "Corner L"),
+        lambda rng: _t_or_l(rng, wide_top=False),
+        ("Length", "Top Width", "Bottom Width"),
+        ("None", "2 Length side ties", "3 Corner ties", "2 ties along the width"),
+    ),
+    "round": (
+        ("Round", "Bistro Round"),
+        lambda rng: {"diameter": _in(rng, 14, 24), "thickness": _in(rng, 2, 4, 0.5)},
+        ("Back", "Side"),
+        ("None", "2 Back Ties", "2 Middle Ties", "4 Ties Evenly Spaced"),
+    ),
+    "semi_round": (
+        ("Semi Round", "Semi Circle Seat"),
+        lambda rng: {"diameter": _in(rng, 16, 30), "thickness": _in(rng, 2, 4, 0.5)},
+        ("Bottom Straight", "Top Curved"),
+        ("None", "2 Curve Edge Ties", "2 Flat Corner Ties", "4 Corner Ties"),
+    ),
+    "curved_indoor": (
+        ("Curved Indoor", "Sectional Curve"),
+        lambda rng: _curved_indoor(rng),
+        ("Long Side", "Short Side"),
+        ("None",),
+    ),
+    "tapered_bolster": (
+        ("Bolster", "Tapered Bolster"),
+        # The bolster drawer only lays out its thickness label when piping is drawn
+        lambda rng: {"top_thickness": _in(rng, 3, 5), "bottom_thickness": _in(rng, 6, 10), "height": _in(rng, 14, 24),
+                     "length": _in(rng, 20, 40), "piping": "Yes"},
+        ("Top", "Bottom", "Angled"),
+        ("None",),
+    ),
+    "curved": (
+        ("Curved", "Curved Bench"),
+        lambda rng: {"width": _in(rng, 20, 40), "side_length": _in(rng, 14, 22), "middle_length": _in(rng, 24, 32),
+                     "thickness": _in(rng, 2, 4, 0.5)},
+        ("Front Side", "Curved Side"),
+        ("No Ties", "2 Front Corner Ties", "2 Curved Edge Ties", "4 Corner Ties"),
+    ),
+    "e_triangle": (
+        ("Tri", "Equilateral Wedge"),
+        lambda rng: {"side": _in(rng, 14, 30), "thickness": _in(rng, 2, 4, 0.5)},
+        ("side",),
+        ("No Ties", "2 Side Ties", "2 Corner Ties", "3 Corner Ties"),
+    ),
+    "left_cushion": (
+        ("Left Window", "Left Arm"),
+        lambda rng: {"top_width": _in(rng, 8, 14), "bottom_width": _in(rng, 16, 26), "length": _in(rng, 20, 40),
+                     "thickness": _in(rng, 2, 4, 0.5)},
+        ("Long Side", "Short Side"),
+        ("None",),
+    ),
+    "right_cushion": (
+        ("Right Window", "Right Arm"),
+        lambda rng: {"top_width": _in(rng, 8, 14), "bottom_width": _in(rng, 16, 26), "length": _in(rng, 20, 40),
+                     "thickness": _in(rng, 2, 4, 0.5)},
+        ("Long Side", "Short Side"),
+        ("None",),
+    ),
+    "clipped_trapeze": (
+        ("Clipped", "Clipped Corner Seat"),
+        lambda rng: {"top_width": _in(rng, 14, 24), "bottom_width": _in(rng, 26, 36), "height": _in(rng, 16, 26),
+                     "edge": _in(rng, 2, 6), "thickness": _in(rng, 2, 4, 0.5)},
+        ("long side", "short side", "angle side", "TopPlusAngled"),
+        ("None", "2 back", "2 corner", "4 corner", "2 side", "2 corner bottom"),
+    ),
+}
+SHAPE_NAMES = tuple(SHAPE_SPECS)
+
+
+def _curved_indoor(rng):
+    front = _in(rng, 80, 110)
+    back = front + _in(rng, 15, 35)
+    return {
+        "length": _in(rng, 18, 26), "front_width_straight": front, "back_width_straight": back,
+        "front_width_curved": front + _in(rng, 10, 20), "back_width_curved": back + _in(rng, 8, 12),
+        "thickness": _in(rng, 2, 4, 0.5), "fabric_collection": rng.choice(("Indoor", "Outdoor")),
+        "fabric_option": f"Royal {rng.randint(1, 9)}",
+    }
+
+
+def generate_cushion(rng, shape):
+    names, dimensions, zippers, ties = SHAPE_SPECS[shape]
+    cushion = {
+        "cushion_name": rng.choice(names),
+        "fill": rng.choice(FILLS),
+        "fabric": rng.choice(FABRICS),
+        "zipper": rng.choice(zippers),
+        "piping": rng.choice(PIPING),
+        "ties": rng.choice(ties),
+        "quantity": rng.randint(1, 4),
+    }
+    cushion.update(dimensions(rng))
+    return cushion
+
+
+def generate_order(cushions=None, seed=0, shapes=SHAPE_NAMES):
+    """An order with ``cushions`` cushions cycling through ``shapes``.
+
+    ``cushions=None`` gives one cushion of each shape.
+    """
+    rng = random.Random(seed)
+    count = len(shapes) if cushions is None else cushions
+    return {
+        "customer_name": f"Bench Customer {seed}",
+        "order_id": f"BENCH-{seed}-{count}",
+        "email": "bench@example.com",
+        "shipping_address": [f"{rng.randint(1, 9999)} Main St", "Springfield, IL 62701"],
+        "billing_address": [f"{rng.randint(1, 9999)} Oak Ave", "Springfield, IL 62704"],
+        "cushions": [generate_cushion(rng, shapes[i % len(shapes)]) for i in range(count)],
+    }
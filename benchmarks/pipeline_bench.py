@@ -0,0 +1,84 @@
+"""Latency, throughput and output size of the full confirmation pipeline.
+
+Posts seeded synthetic orders (see benchmarks.orders) to /generate-confirmation
+in-process, at several order sizes and in every render mode, and reports as
+JSON: request latency percentiles, orders and cushions per second, PDF bytes,
+per-stage latency percentiles (the stages /metrics times) and per-shape
+drawer latency percentiles. Every iteration uses a new seed, so the document
+cache never answers for the renderer.
+
+Run from the repository root:
+    python -m benchmarks.pipeline_bench [--sizes 1,14,50] [--iterations 5] [--modes merge,single_pass] [--seed 0]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="pipeline_bench_")
+os.environ.setdefault("PDF_DIR", os.path.join(WORK_DIR, "pdfs"))
+os.environ.setdefault("PDF_INDEX_DB", os.path.join(WORK_DIR, "pdf_index.db"))
+os.environ.setdefault("JOBS_DB", os.path.join(WORK_DIR, "jobs.db"))
+os.environ.setdefault("COUNTER_DB", os.path.join(WORK_DIR, "counter.db"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app2  # noqa: E402
+from confirmation_pdf import RENDER_MODES  # noqa: E402
+from metrics import DRAWER_SECONDS, STAGE_SECONDS  # noqa: E402
+from benchmarks.orders import generate_order  # noqa: E402
+from benchmarks.stats import HistogramSamples, percentiles  # noqa: E402
+
+
+def _post(client, order, render_mode):
+    started = time.perf_counter()
+    response = client.post(f"/generate-confirmation?render_mode={render_mode}&response=pdf", json=order)
+    elapsed = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"{render_mode} render failed: {response.status_code} {response.get_data(as_text=True)}")
+    return elapsed, len(response.data)
+
+
+def run(sizes=(1, 14, 50), iterations=5, modes=RENDER_MODES, seed=0):
+    client = app2.app.test_client()
+    for render_mode in modes:
+        # Import drawers, load fonts and start pools outside the timed runs
+        _post(client, generate_order(seed=seed - 1), render_mode)
+
+    runs = []
+    shapes = {}
+    for render_mode in modes:
+        with HistogramSamples(DRAWER_SECONDS, "shape") as drawers:
+            for size in sizes:
+                latencies, sizes_out = [], []
+                with HistogramSamples(STAGE_SECONDS, "stage") as stages:
+                    for i in range(iterations):
+                        elapsed, nbytes = _post(client, generate_order(size, seed + i), render_mode)
+                        latencies.append(elapsed)
+                        sizes_out.append(nbytes)
+                total = sum(latencies)
+                runs.append({
+                    "render_mode": render_mode,
+                    "cushions": size,
+                    "iterations": iterations,
+                    "latency": percentiles(latencies),
+                    "orders_per_s": round(iterations / total, 3),
+                    "cushions_per_s": round(iterations * size / total, 2),
+                    "pdf_bytes": {"mean": round(sum(sizes_out) / len(sizes_out)), "min": min(sizes_out),
+                                  "max": max(sizes_out)},
+                    "stages": {stage: percentiles(values) for stage, values in stages.values.items()},
+                })
+        shapes[render_mode] = {shape: percentiles(values) for shape, values in sorted(drawers.values.items())}
+    return {"seed": seed, "runs": runs, "drawer_by_shape": shapes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1,14,50")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--modes", default=",".join(RENDER_MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    report = run(tuple(int(s) for s in args.sizes.split(",")), args.iterations,
+                 tuple(args.modes.split(",")), args.seed)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,83 @@
+"""Bytes and time spent serving one confirmation to a PDF viewer that opens it repeatedly.
+
+"before": every open is a plain GET that downloads the whole file.
+"after":  the first open downloads it, later opens revalidate with If-None-Match
+          (304, no body) and the viewer fetches pages with Range requests.
+
+Run from the repository root:  python -m benchmarks.serve_pdf_bench [opens] [cushions]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+WORK_DIR = tempfile.mkdtemp(prefix="serve_pdf_bench_")
+os.environ.setdefault("PDF_DIR", os.path.join(WORK_DIR, "pdfs"))
+os.environ.setdefault("PDF_INDEX_DB", os.path.join(WORK_DIR, "pdf_index.db"))
+os.environ.setdefault("JOBS_DB", os.path.join(WORK_DIR, "jobs.db"))
+os.environ.setdefault("COUNTER_DB", os.path.join(WORK_DIR, "counter.db"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app2  # noqa: E402
+from benchmarks.orders import generate_order  # noqa: E402
+
+RANGE_CHUNK = 64 * 1024
+
+
+def _timed(client, url, headers=None):
+    started = time.perf_counter()
+    response = client.get(url, headers=headers or {})
+    body = response.data
+    return response, len(body), time.perf_counter() - started
+
+
+def run(opens=20, cushions=40):
+    client = app2.app.test_client()
+    response = client.post("/generate-confirmation?in_memory=1&response=link", json=generate_order(cushions))
+    url = urlsplit(response.get_json()["pdf_link"]).path
+
+    before_bytes = 0
+    before_time = 0.0
+    for _ in range(opens):
+        _, nbytes, elapsed = _timed(client, url)
+        before_bytes += nbytes
+        before_time += elapsed
+
+    first, after_bytes, after_time = _timed(client, url)
+    etag = first.headers["ETag"]
+    size = int(first.headers["Content-Length"])
+    statuses = {}
+    for _ in range(opens - 1):
+        response, nbytes, elapsed = _timed(client, url, {"If-None-Match": etag})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        after_bytes += nbytes
+        after_time += elapsed
+    # A viewer jumping to the last page reads the trailer, then one chunk;
+    # chunks stay inside the file so both ranges are satisfiable
+    chunk = max(1, min(RANGE_CHUNK, size // 2))
+    for header in (f"bytes=-{chunk}", f"bytes=0-{chunk - 1}"):
+        response, nbytes, elapsed = _timed(client, url, {"Range": header})
+        if response.status_code != 206:
+            raise RuntimeError(f"Range {header} answered {response.status_code}, expected 206")
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        after_bytes += nbytes
+        after_time += elapsed
+
+    return {
+        "opens": opens,
+        "cushions": cushions,
+        "file_bytes": size,
+        "cache_control": first.headers.get("Cache-Control"),
+        "before": {"bytes_served": before_bytes, "seconds": round(before_time, 4)},
+        "after": {"bytes_served": after_bytes, "seconds": round(after_time, 4),
+                  "statuses": {str(k): v for k, v in sorted(statuses.items())}},
+        "bytes_saved_pct": round(100.0 * (1 - after_bytes / before_bytes), 1) if before_bytes else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    opens = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cushions = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    print(json.dumps(run(opens, cushions), indent=2))
@@ -0,0 +1,76 @@
+"""Import-time budget for worker startup.
+
+Imports app2 in fresh interpreters under ``python -X importtime`` and reports
+the median self/cumulative import time of every project module, the heaviest
+third-party modules, and whether drawer modules were loaded at boot.
+
+Run from the repository root:
+    python -m benchmarks.startup_bench [--runs 5] [--budget-ms 400]
+Exits with status 1 when the median app2 import time exceeds the budget.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_MODULES = {os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(REPO_DIR, "*.py"))}
+
+
+def _import_times(work_dir):
+    env = dict(os.environ)
+    env.update({
+        "PDF_DIR": os.path.join(work_dir, "pdfs"),
+        "PDF_INDEX_DB": os.path.join(work_dir, "pdf_index.db"),
+        "JOBS_DB": os.path.join(work_dir, "jobs.db"),
+        "COUNTER_DB": os.path.join(work_dir, "counter.db"),
+        "LOG_LEVEL": "WARNING",
+    })
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app2"],
+                            cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def run(runs=5):
+    work_dir = tempfile.mkdtemp(prefix="startup_bench_")
+    samples = [_import_times(work_dir) for _ in range(runs)]
+    names = set().union(*samples)
+
+    def median(name, index):
+        return statistics.median(s[name][index] for s in samples if name in s) / 1000.0
+
+    project = {name: {"self_ms": round(median(name, 0), 2), "cumulative_ms": round(median(name, 1), 2)}
+               for name in sorted(names & PROJECT_MODULES)}
+    third_party = sorted((n for n in names if n not in PROJECT_MODULES and "." not in n),
+                         key=lambda n: -median(n, 1))[:10]
+    return {
+        "runs": runs,
+        "app2_import_ms": round(median("app2", 1), 2),
+        "project_modules": project,
+        "heaviest_third_party": {n: round(median(n, 1), 2) for n in third_party},
+        "drawers_loaded_at_startup": sorted(n for n in names if n.endswith("_drawer")),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+    report = run(args.runs)
+    if args.budget_ms is not None:
+        report["budget_ms"] = args.budget_ms
+        report["within_budget"] = report["app2_import_ms"] <= args.budget_ms
+    print(json.dumps(report, indent=2))
+    if args.budget_ms is not None and not report["within_budget"]:
+        sys.exit(1)
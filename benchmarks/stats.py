@@ -0,0 +1,36 @@
+"""Helpers shared by the benchmarks: percentiles and raw samples of metrics histograms."""
+
+
+def percentiles(samples):
+    """p50/p90/p99/max of ``samples`` (seconds) in milliseconds, nearest rank."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))]
+
+    return {"n": len(ordered), "p50_ms": round(rank(50) * 1000, 3), "p90_ms": round(rank(90) * 1000, 3),
+            "p99_ms": round(rank(99) * 1000, 3), "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+class HistogramSamples:
+    """Keeps every value observed by a metrics Histogram, grouped by one label, while active."""
+
+    def __init__(self, histogram, label):
+        self.histogram = histogram
+        self.label = label
+        self.values = {}
+
+    def __enter__(self):
+        observe = self.histogram.observe
+
+        def recording_observe(value, **labels):
+            self.values.setdefault(labels.get(self.label), []).append(value)
+            observe(value, **labels)
+
+        self.histogram.observe = recording_observe
+        return self
+
+    def __exit__(self, *exc):
+        del self.histogram.observe
@@ -0,0 +1,138 @@
+"""text_layout wraps text exactly as the code it replaced did.
+
+Compares, on random texts, widths, fonts and sizes, a frozen copy of the
+per-drawer draw_wrapped_text, the spec column's _draw_wrapped_kv and
+_wrapped_line_count (which re-measured the whole line for every word) with
+text_layout.draw_wrapped_text and confirmation_pdf's current versions: the
+same lines at the same positions, and the same returned y.
+
+Run from the repository root:
+    python -m benchmarks.wrap_check [--texts 20000] [--seed 0]
+Exits with status 1 when any text wraps differently.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from reportlab.pdfbase.pdfmetrics import stringWidth  # noqa: E402
+
+from confirmation_pdf import _draw_wrapped_kv, _wrapped_line_count  # noqa: E402
+from diagram_cache import DiagramRecorder  # noqa: E402
+from text_layout import draw_wrapped_text  # noqa: E402
+from benchmarks.orders import FABRICS, FILLS  # noqa: E402
+
+FONTS = ("Helvetica", "Helvetica-Bold")
+# Words that fit nowhere, to exercise the over-wide word lines
+LONG_WORDS = ("Supercalifragilisticexpialidocious-Outdoor-Canvas", "W" * 40)
+
+
+def legacy_draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
+    words = text.split()
+    line = ""
+    for word in words:
+        test_line = f"{line} {word}".strip()
+        width = stringWidth(test_line, font_name, font_size)
+        if width <= max_width:
+            line = test_line
+        else:
+            c.drawString(x, y, line)
+            y -= line_height
+            line = word
+    if line:
+        c.drawString(x, y, line)
+        y -= line_height
+    return y
+
+
+def legacy_wrapped_line_count(text, max_width, font_name="Helvetica", font_size=12):
+    lines = 0
+    line = ""
+    for word in str(text).split():
+        test_line = f"{line} {word}".strip()
+        if stringWidth(test_line, font_name, font_size) <= max_width:
+            line = test_line
+        else:
+            lines += 1
+            line = word
+    return lines + (1 if line else 0)
+
+
+def legacy_draw_wrapped_kv(cnv, x, y, label, value, max_width):
+    label_text = f"{label} : "
+    font_label = ("Helvetica-Bold", 12)
+    font_value = ("Helvetica", 12)
+    line_height = 0.20 * 72
+    label_w = stringWidth(label_text, font_label[0], font_label[1])
+    value_w_max = max_width - label_w
+    words = str(value).split()
+    line = ""
+    cnv.setFont(*font_label)
+    cnv.drawString(x, y, label_text)
+    cnv.setFont(*font_value)
+    for word in words:
+        test = (line + " " + word).strip()
+        if stringWidth(test, font_value[0], font_value[1]) <= value_w_max:
+            line = test
+        else:
+            cnv.drawString(x + label_w, y, line)
+            y -= line_height
+            line = word
+    if line:
+        cnv.drawString(x + label_w, y, line)
+        y -= line_height
+    return y - 4
+
+
+def _random_text(rng):
+    vocabulary = " ".join(FABRICS + FILLS).split() + list(LONG_WORDS)
+    words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 30))]
+    return rng.choice((" ", "  ", " \t")).join(words)
+
+
+def _drawn(draw, *args):
+    recorder = DiagramRecorder()
+    y = draw(recorder, *args)
+    return recorder.ops, y
+
+
+def run(texts=20000, seed=0):
+    rng = random.Random(seed)
+    mismatches = []
+    mismatched = 0
+    for _ in range(texts):
+        text = _random_text(rng)
+        max_width = rng.uniform(20, 400)
+        font_name, font_size = rng.choice(FONTS), rng.choice((8, 9, 10, 12, 14))
+        checks = {
+            "draw_wrapped_text": (
+                _drawn(legacy_draw_wrapped_text, 10, 700, text, max_width, font_name, font_size),
+                _drawn(draw_wrapped_text, 10, 700, text, max_width, font_name, font_size)),
+            "draw_wrapped_kv": (
+                _drawn(legacy_draw_wrapped_kv, 10, 700, "Fabric", text, max_width + 80),
+                _drawn(_draw_wrapped_kv, 10, 700, "Fabric", text, max_width + 80)),
+            "wrapped_line_count": (
+                legacy_wrapped_line_count(text, max_width, font_name, font_size),
+                _wrapped_line_count(text, max_width, font_name, font_size)),
+        }
+        for name, (expected, actual) in checks.items():
+            if expected != actual:
+                mismatched += 1
+                if len(mismatches) < 20:
+                    mismatches.append({"check": name, "text": text, "max_width": max_width,
+                                       "font": [font_name, font_size]})
+    return {"seed": seed, "texts": texts, "mismatched": mismatched, "mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    report = run(args.texts, args.seed)
+    print(json.dumps(report, indent=2))
+    if report["mismatched"]:
+        sys.exit(1)
@@ -4,27 +4,12 @@ from reportlab.lib.units import inch
 from reportlab.lib.colors import red, black, blue, green
 import uuid
 import math
+from text_layout import draw_wrapped_text, wrapped_text_bottom
 
+REQUIRED_DIMENSIONS = ("top_width", "bottom_width", "height", "edge")
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-         c.drawString(x, y, line)
-         y -= line_height
-    return y  # return new y position
-
-def draw_clipped_trapeze(c,cushion): 
+
+def draw_clipped_trapeze(c,cushion, diagram_only=False): 
     cushion_name = cushion.get('cushion_name', 'Cushion Specifications')
     bottom_width = cushion["bottom_width"]
     top_width = cushion["top_width"]
@@ -67,8 +52,9 @@ def draw_clipped_trapeze(c,cushion):
     width, height = letter
 
     # Title and specs
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(1 * inch, height - 1 * inch, "CONFIRMATION - CLIPPED TRAPEZOID")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(1 * inch, height - 1 * inch, "CONFIRMATION - CLIPPED TRAPEZOID")
 
 
 
@@ -92,11 +78,15 @@ def draw_clipped_trapeze(c,cushion):
     
 
     for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
         max_value_width = width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+        if diagram_only:
+            # Not drawn, but the diagram below is placed from where the table ends
+            y = wrapped_text_bottom(y, value, max_value_width)
+        else:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
         y -= 4  # extra spacing between spec rows
 
     # # Origin shift
@@ -0,0 +1,707 @@
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from pypdf import PdfReader, PdfWriter, Transformation
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, NameObject
+from diagram_cache import DIAGRAM_CACHE, DiagramRecorder, replay_diagram
+from crop_filter import CropFilterCanvas
+from metrics import DRAWER_SECONDS, HIDDEN_OPS_STRIPPED, observe_stage
+from log_utils import request_id_var, setup_logging
+from shape_registry import resolve_shape
+from text_layout import draw_wrapped_text, text_width, wrap_lines
+
+logger = logging.getLogger("confirmation.pdf")
+
+# "merge": every drawer renders a full page, pages are cropped and 2-up merged with pypdf.
+# "single_pass": every drawer paints straight into its slot on the final canvas.
+RENDER_MODES = ("merge", "single_pass")
+# Leave out drawer output (titles, spec tables) that the crop would hide anyway
+STRIP_HIDDEN_CONTENT = os.environ.get("STRIP_HIDDEN_CONTENT", "1") == "1"
+# Cropped drawer pages skip their title and spec table entirely; the spec
+# column already prints them, so the drawers only lay out the diagram
+DIAGRAM_ONLY = os.environ.get("DIAGRAM_ONLY", "1") == "1"
+
+W, H = letter
+margin_x = 0.20 * 72  # ~0.20 inch for larger content
+margin_y = 0.20 * 72
+
+# Force two cushions per page so each new cushion starts at page top.
+slots_per_page = 2
+
+# Slot dimensions (target area for each cushion diagram)
+slot_w = W - 2 * margin_x
+slot_h = (H - 2 * margin_y) / slots_per_page
+
+# Precompute slot top edges (top-down order) so first cushion starts at page top
+slots_top_y = [H - margin_y - i * slot_h for i in range(slots_per_page)]
+
+# Layout: specs on left, diagram on right with a small gutter so they are close
+text_ratio = 0.28
+gutter_x = 0.18 * 72  # wider gap to keep text out of diagram
+text_w = slot_w * text_ratio
+diagram_w_target = slot_w - text_w - gutter_x
+
+
+def draw_cover_page(c, customer_name, order_id, email, shipping_address, billing_address):
+    page_width, page_height = letter
+    c.setFont("Helvetica-Bold", 20)
+    c.drawString(1 * inch, page_height - 1 * inch, "ORDER CONFIRMATION")
+    y_left = page_height - 1.6 * inch
+    details = [
+        ("Customer Name", customer_name),
+        ("Order Number", order_id),
+        ("Email", email),
+        ("Shipping Address", "")
+    ] + [("", line) for line in shipping_address] + [
+        ("Billing Address", "")
+    ] + [("", line) for line in billing_address]
+
+    for label, value in details:
+        if label:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(1 * inch, y_left, f"{label}:")
+            c.setFont("Helvetica", 12)
+            c.drawString(2.8 * inch, y_left, value)
+        elif value:
+            c.setFont("Helvetica", 12)
+            c.drawString(1.2 * inch, y_left, value)
+        y_left -= 0.25 * inch
+
+
+def draw_cushion(c, cushion, shape=None, window=None, stats=None, diagram_only=False):
+    """Run the cushion's drawer on ``c``.
+
+    With a crop ``window`` (x0, y0, x1, y1), calls that land entirely outside
+    it are dropped; the count goes into ``stats["hidden_ops_stripped"]``.
+    ``diagram_only`` has the drawer skip its title and spec table.
+    """
+    shape = shape or resolve_shape(cushion)
+    logger.debug("drawing cushion", extra={"fields": {"drawer": shape.drawer.__name__}})
+    if window is not None:
+        c = CropFilterCanvas(c, window)
+    started = time.perf_counter()
+    shape.drawer(c, cushion, diagram_only=diagram_only)
+    DRAWER_SECONDS.observe(time.perf_counter() - started, shape=shape.name)
+    if window is not None:
+        HIDDEN_OPS_STRIPPED.inc(c.stripped, shape=shape.name)
+        _count_io(stats, "hidden_ops_stripped", c.stripped)
+
+
+# Fields a drawer only prints in its page title, never in the diagram
+HEADER_ONLY_KEYS = ("cushion_name", "quantity")
+# Free-text spec values. They only appear in the drawer's spec table, but some
+# drawers size the diagram from where that table ends, so with the table left
+# out only the number of lines each value wraps to matters.
+FREE_TEXT_KEYS = ("fill", "fabric", "fabric_collection", "fabric_option")
+# Value column width of the drawers' spec tables: page_width - (1 inch + 130 + 1 inch)
+DRAWER_SPEC_VALUE_WIDTH = W - (2 * inch + 130)
+
+
+def _wrapped_line_count(text, max_width, font_name="Helvetica", font_size=12):
+    return len(wrap_lines(text, max_width, font_name, font_size))
+
+
+def diagram_key(cushion, shape=None):
+    """Identity of the visible diagram a cushion renders to.
+
+    Two cushions with the same key produce the same recording, so it can be
+    drawn once and reused. Title and spec fields are only left out of the key
+    when the recording leaves them out too (DIAGRAM_ONLY); otherwise the
+    recording carries their text, even where the crop hides it, and one
+    customer's cushion name or fabric would be replayed into another's PDF.
+    """
+    if not DIAGRAM_ONLY:
+        fields = cushion
+    else:
+        fields = {}
+        for k, v in cushion.items():
+            if k in HEADER_ONLY_KEYS:
+                continue
+            if k in FREE_TEXT_KEYS:
+                v = {"wrapped_lines": _wrapped_line_count(v, DRAWER_SPEC_VALUE_WIDTH)}
+            fields[k] = v
+    shape = shape or resolve_shape(cushion)
+    return f"{shape.name}:{json.dumps(fields, sort_keys=True, default=str)}"
+
+
+def _cache_key(key):
+    # Stripped, diagram-only and full recordings of a diagram are different fragments
+    key = f"{key}|strip={int(STRIP_HIDDEN_CONTENT)}|diagram_only={int(DIAGRAM_ONLY)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def draw_cached_diagram(c, cushion, key=None, fragments=None, shape=None, stats=None):
+    # Replay the drawer's recorded output when this diagram has been drawn
+    # before (by this or an earlier request); otherwise record and cache it.
+    if key is None:
+        key = diagram_key(cushion, shape)
+    if fragments and key in fragments:
+        replay_diagram(c, fragments[key])
+        return
+    if not DIAGRAM_CACHE.enabled:
+        shape = shape or resolve_shape(cushion)
+        draw_cushion(c, cushion, shape, crop_window(shape) if STRIP_HIDDEN_CONTENT else None, stats,
+                     DIAGRAM_ONLY)
+        return
+    cache_key = _cache_key(key)
+    ops = DIAGRAM_CACHE.get(cache_key)
+    if ops is None:
+        ops = record_diagram(cushion, shape, stats)
+        DIAGRAM_CACHE.put(cache_key, ops)
+    replay_diagram(c, ops)
+
+
+# Single-pass orders with at least this many cushions record their diagrams in
+# a process pool before the pages are assembled (0 keeps every order serial)
+PARALLEL_MIN_CUSHIONS = int(os.environ.get("PARALLEL_MIN_CUSHIONS", 40))
+PARALLEL_WORKERS = int(os.environ.get("PARALLEL_WORKERS", os.cpu_count() or 1))
+# How pool workers are started; forking from a request thread can hand the
+# child a lock (metrics, diagram cache) that another thread was holding
+PARALLEL_START_METHOD = os.environ.get("PARALLEL_START_METHOD", "forkserver")
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def record_diagram(cushion, shape=None, stats=None):
+    # Run the drawer into a recorder and return its fragment
+    shape = shape or resolve_shape(cushion)
+    recorder = DiagramRecorder()
+    draw_cushion(recorder, cushion, shape, crop_window(shape) if STRIP_HIDDEN_CONTENT else None, stats,
+                 DIAGRAM_ONLY)
+    return tuple(recorder.ops)
+
+
+def _record_in_pool(cushion, request_id):
+    request_id_var.set(request_id)
+    return record_diagram(cushion)
+
+
+def _get_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                               mp_context=multiprocessing.get_context(PARALLEL_START_METHOD),
+                                               initializer=setup_logging)
+        return _render_pool
+
+
+def _drop_render_pool(pool):
+    # A worker died (OOM kill, crash); the next large order starts a new pool
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False)
+
+
+def _forget_render_pool():
+    # A forked child (e.g. a gunicorn worker) inherits the parent's pool
+    # object but none of its worker processes; it must start its own
+    global _render_pool, _render_pool_lock
+    _render_pool = None
+    _render_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_render_pool)
+
+
+def prerender_diagrams(cushions, keys):
+    """Record, in parallel, every distinct diagram the cache cannot serve.
+
+    Returns {diagram_key: fragment}; fragments also go into the diagram cache.
+    """
+    pending = {}
+    for cushion, key in zip(cushions, keys):
+        if key not in pending and not DIAGRAM_CACHE.contains(_cache_key(key)):
+            pending[key] = cushion
+    if not pending:
+        return {}
+    chunksize = max(1, len(pending) // (PARALLEL_WORKERS * 4))
+    cushions = list(pending.values())
+    request_ids = [request_id_var.get()] * len(cushions)
+    pool = _get_render_pool()
+    try:
+        results = list(pool.map(_record_in_pool, cushions, request_ids, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.warning("render pool broke, recording diagrams serially",
+                       extra={"fields": {"diagrams": len(cushions)}})
+        _drop_render_pool(pool)
+        results = [record_diagram(cushion) for cushion in cushions]
+    fragments = dict(zip(pending, results))
+    for key, ops in fragments.items():
+        DIAGRAM_CACHE.put(_cache_key(key), ops)
+    return fragments
+
+
+def _draw_wrapped_kv(cnv, x, y, label, value, max_width):
+    label_text = f"{label} : "
+    font_label = ("Helvetica-Bold", 12)
+    font_value = ("Helvetica", 12)
+    line_height = 0.20 * 72
+
+    label_w = text_width(label_text, *font_label)
+
+    cnv.setFont(*font_label)
+    cnv.drawString(x, y, label_text)
+    cnv.setFont(*font_value)
+    y = draw_wrapped_text(cnv, x + label_w, y, value, max_width - label_w, *font_value, line_height)
+
+    return y - 4  # extra spacing between rows
+
+
+def draw_specs_block(cnv, cushion, slot_top_y, shape=None):
+    x = margin_x
+    y = slot_top_y - 0.15 * inch
+    cnv.setFont("Helvetica-Bold", 14)
+
+    shape_label = (shape or resolve_shape(cushion)).label
+
+    # For Trapezoid, print the exact ordered block requested
+    if shape_label == "Trapezoid":
+        fields_order = [
+            ("__shape__", "Shape"),
+            ("top_base", "Top Base"),
+            ("bottom_base", "Bottom Base"),
+            ("height", "Height"),
+            ("thickness", "Thickness"),
+            ("zipper", "Zipper Position"),
+            ("piping", "Piping"),
+            ("ties", "Ties"),
+            ("quantity", "Quantity"),
+            ("fill", "Fill"),
+            ("fabric", "Fabric"),
+        ]
+    else:
+        # Generic fallback (hide zeros), include zipper
+        fields_order = [
+            ("__shape__", "Shape"),
+            ("length", "Length"),
+            ("width", "Width"),
+            ("bottom_width", "Bottom Width"),
+            ("top_width", "Top Width"),
+            ("ear", "Ear"),
+            ("height", "Height"),
+            ("side", "Side"),
+            ("side_length", "Side Length"),
+            ("middle_length", "Middle Length"),
+            ("diameter", "Diameter"),
+            ("top_base", "Top Base"),
+            ("bottom_base", "Bottom Base"),
+            ("edge", "Clipping Edge"),
+            ("top_thickness", "Top Thickness"),
+            ("bottom_thickness", "Bottom Thickness"),
+            ("thickness", "Thickness"),
+            ("zipper", "Zipper Position"),
+            ("piping", "Piping"),
+            ("ties", "Ties"),
+            ("quantity", "Quantity"),
+            ("fill", "Fill"),
+            ("fabric", "Fabric"),
+        ]
+
+    for key, label in fields_order:
+        if key not in cushion:
+            if key == "__shape__":
+                val = shape_label or cushion.get("cushion_name", "")
+            else:
+                continue
+        else:
+            val = cushion[key]
+        # Skip empty or zero values
+        if val is None:
+            continue
+        try:
+            if isinstance(val, (int, float)) and float(val) == 0:
+                continue
+            if isinstance(val, str) and val.strip() == "0":
+                continue
+        except Exception:
+            pass
+        # Ensure long Fabric stays in left column, not diagram
+        y = _draw_wrapped_kv(cnv, x, y, label, val, text_w - 2)
+
+
+def crop_trims(shape):
+    # Trim source page to remove the drawer's own header/specs.
+    # Use tighter crops for trapezoid pages to maximize diagram size.
+    if shape is not None and shape.crop == "trapezoid":
+        # Trim more on the left to remove stray partial thickness text (e.g., just '3')
+        left_trim   = 0.95 * 72
+        right_trim  = 0.70 * 72
+        bottom_trim = 0.25 * 72
+        top_trim    = H * 0.60
+    else:
+        side_trim_in = 0.40
+        left_trim   = side_trim_in * 72
+        right_trim  = side_trim_in * 72
+        bottom_trim = side_trim_in * 72
+        top_trim    = H * 0.45
+    return left_trim, right_trim, bottom_trim, top_trim
+
+
+def crop_window(shape):
+    """(x0, y0, x1, y1) of a drawer page of ``shape`` that stays visible after cropping."""
+    left_trim, right_trim, bottom_trim, top_trim = crop_trims(shape)
+    return left_trim, bottom_trim, W - right_trim, H - top_trim
+
+
+def slot_placement(shape, si):
+    """Return (scale, tx, ty, trims) mapping a drawer page of ``shape`` into slot ``si``."""
+    left_trim, right_trim, bottom_trim, top_trim = crop_trims(shape)
+    visible_w = W - left_trim - right_trim
+    visible_h = H - top_trim - bottom_trim
+
+    # Scale to fit the diagram region on the right side
+    s_local = min(diagram_w_target / visible_w, slot_h / visible_h)
+
+    # Place diagram flush against the text column with a small gutter,
+    # top-aligned to the slot so it stays parallel with details.
+    right_x0 = margin_x + text_w + gutter_x
+    tx = right_x0 - s_local * left_trim
+    top_pad = 0.10 * 72  # ~0.10 inch
+    slot_top_y = slots_top_y[si]
+    # Inner safety padding to ensure labels like thickness don’t touch slot edges
+    inner_pad_top = 0.06 * 72
+    inner_pad_bottom = 0.06 * 72
+    ty = (
+        slot_top_y
+        - top_pad
+        - inner_pad_top
+        - (s_local * visible_h)
+        - s_local * bottom_trim
+        + inner_pad_bottom
+    )
+    return s_local, tx, ty, (left_trim, right_trim, bottom_trim, top_trim)
+
+
+class SlotCanvas:
+    """Canvas proxy that lets a full-page drawer paint into a slot.
+
+    Every call is forwarded to the real canvas except ``showPage``, so the
+    drawer's closing page break does not end the shared 2-up page.
+    """
+
+    def __init__(self, canv):
+        self._canv = canv
+
+    def showPage(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._canv, name)
+
+
+def _draw_cushions(c, cushions, shapes, stats=None):
+    logger.debug(f"Processing {len(cushions)} cushions")
+    for i, cushion in enumerate(cushions):
+        logger.debug(f"Processing cushion {i+1}: {cushion.get('cushion_name', 'Unnamed')}")
+        # The first cushion shares the cover page, which is kept whole; raw
+        # page i is cropped with the trims of shapes[i - 1] when composed
+        window = crop_window(shapes[i - 1]) if STRIP_HIDDEN_CONTENT and i > 0 else None
+        draw_cushion(c, cushion, shapes[i], window, stats, DIAGRAM_ONLY and i > 0)
+
+
+def _count_io(stats, key, nbytes):
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + nbytes
+
+
+def _new_target(work_dir, prefix):
+    # Intermediate PDFs live in memory unless a scratch directory is given
+    if work_dir is None:
+        return io.BytesIO()
+    return os.path.join(work_dir, f"{prefix}_{uuid.uuid4().hex}.pdf")
+
+
+def _reopen(target, stats):
+    if isinstance(target, str):
+        size = os.path.getsize(target)
+        _count_io(stats, "disk_bytes_written", size)
+        _count_io(stats, "disk_bytes_read", size)
+        return target
+    target.seek(0)
+    return target
+
+
+def _remove_target(target):
+    if isinstance(target, str):
+        try:
+            os.remove(target)
+        except Exception:
+            pass
+
+
+def save_pdf_bytes(filepath, pdf_bytes, stats=None):
+    with open(filepath, "wb") as f_out:
+        f_out.write(pdf_bytes)
+    _count_io(stats, "disk_bytes_written", len(pdf_bytes))
+
+
+# How merge mode places cropped cushion pages on the 2-up pages:
+# "xobject" wraps each page as a Form XObject drawn with one cm/Do,
+# "transform" has pypdf rewrite its content into the base page (the old path)
+MERGE_COMPOSITION = os.environ.get("MERGE_COMPOSITION", "xobject")
+MERGE_COMPOSITIONS = ("xobject", "transform")
+
+
+def _add_stream(writer, stream):
+    # pypdf (pinned in requirements.txt) has no public call that registers a
+    # new stream as an indirect object; keep the private one here so an
+    # upgrade that changes it breaks in one place
+    return writer._add_object(stream)
+
+
+def _page_form(writer, page, bbox):
+    """Return a reference to ``page`` wrapped as a Form XObject in ``writer``.
+
+    The page's content stream is reused as-is (still compressed) and /BBox
+    clips it to ``bbox``, the way merge_transformed_page clips to the cropbox.
+    """
+    contents = page.raw_get("/Contents").get_object()
+    if isinstance(contents, ArrayObject):
+        joined = DecodedStreamObject()
+        joined.set_data(b"\n".join(part.get_object().get_data() for part in contents))
+        form_ref = _add_stream(writer, joined.flate_encode())
+    else:
+        form_ref = page.raw_get("/Contents").clone(writer)
+    form = form_ref.get_object()
+    form[NameObject("/Type")] = NameObject("/XObject")
+    form[NameObject("/Subtype")] = NameObject("/Form")
+    form[NameObject("/BBox")] = ArrayObject(FloatObject(v) for v in bbox)
+    if "/Resources" in page:
+        form[NameObject("/Resources")] = page.raw_get("/Resources").clone(writer)
+    return form_ref
+
+
+def _pdf_number(value):
+    return f"{value:.6f}".rstrip("0").rstrip(".")
+
+
+def _place_forms(writer, page, placements):
+    """Draw each (name, form_ref, ctm, bbox) in ``placements`` over ``page``.
+
+    The page's own content is left untouched and bracketed with q/Q; the
+    placements go in one small stream appended after it. Each form is also
+    clipped with a path, as merge_transformed_page does, since viewers may
+    snap a /BBox clip to whole pixels.
+    """
+    resources = DictionaryObject(page["/Resources"].get_object()) if "/Resources" in page else DictionaryObject()
+    xobjects = DictionaryObject(resources["/XObject"].get_object()) if "/XObject" in resources else DictionaryObject()
+    ops = ["Q"]
+    for name, form_ref, ctm, (x0, y0, x1, y1) in placements:
+        xobjects[NameObject(name)] = form_ref
+        matrix = " ".join(_pdf_number(v) for v in ctm)
+        clip = " ".join(_pdf_number(v) for v in (x0, y0, x1 - x0, y1 - y0))
+        ops.append(f"q {matrix} cm {clip} re W n {name} Do Q")
+    resources[NameObject("/XObject")] = xobjects
+    page[NameObject("/Resources")] = resources
+
+    push = DecodedStreamObject()
+    push.set_data(b"q\n")
+    pop = DecodedStreamObject()
+    pop.set_data(("\n" + "\n".join(ops) + "\n").encode("ascii"))
+    contents = page.raw_get("/Contents")
+    parts = list(contents.get_object()) if isinstance(contents.get_object(), ArrayObject) else [contents]
+    page[NameObject("/Contents")] = ArrayObject([_add_stream(writer, push), *parts, _add_stream(writer, pop)])
+
+
+def build_merged_pdf(data, out, work_dir=None, stats=None, composition=None):
+    composition = composition or MERGE_COMPOSITION
+    if composition not in MERGE_COMPOSITIONS:
+        raise ValueError(f"Unknown merge composition: {composition}")
+
+    cushions = data['cushions']
+    shapes = [resolve_shape(cushion) for cushion in cushions]
+
+    # Generate initial single-cushion-per-page PDF, then 2-up it into the final output
+    raw_target = _new_target(work_dir, "raw")
+    base_target = None
+
+    mark = time.perf_counter()
+    c = canvas.Canvas(raw_target, pagesize=letter)
+    draw_cover_page(c, data['customer_name'], data['order_id'], data['email'],
+                    data['shipping_address'], data['billing_address'])
+    # c.showPage()
+
+    _draw_cushions(c, cushions, shapes, stats)
+    mark = observe_stage("merge", "drawers", mark)
+    # Finish raw PDF and then produce a 2-up final PDF (two cushions per page)
+    c.save()
+    mark = observe_stage("merge", "raw_save", mark)
+
+    try:
+        reader = PdfReader(_reopen(raw_target, stats))
+        writer = PdfWriter()
+
+        # Keep the first page (customer info) as-is
+        if len(reader.pages) >= 1:
+            writer.add_page(reader.pages[0])
+        mark = observe_stage("merge", "raw_parse", mark)
+
+        # Create base pages with specs in the left column for each slot
+        base_target = _new_target(work_dir, "layout")
+        bc = canvas.Canvas(base_target, pagesize=letter)
+
+        # Build base pages
+        total = len(cushions)
+        page_count = (total + slots_per_page - 1) // slots_per_page
+        for p in range(page_count):
+            for si in range(slots_per_page):
+                idx = p * slots_per_page + si
+                if idx >= total:
+                    break
+                # Top y for this slot (top-down)
+                slot_top_y = slots_top_y[si]
+                draw_specs_block(bc, cushions[idx], slot_top_y, shapes[idx])
+
+                # Thickness label is rendered inside each drawer; do not overlay to avoid duplicates
+            bc.showPage()
+        bc.save()
+        mark = observe_stage("merge", "layout", mark)
+
+        base_reader = PdfReader(_reopen(base_target, stats))
+
+        # Process cushion pages starting from index 1 (skip cover) and compose onto base pages
+        cushion_pages = reader.pages[1:]
+        for p in range(page_count):
+            new_page = writer.add_page(base_reader.pages[p])
+            placements = []
+            for si in range(slots_per_page):
+                pi = p * slots_per_page + si
+                if pi >= len(cushion_pages):
+                    break
+                src_page = cushion_pages[pi]
+
+                current_shape = shapes[pi] if pi < len(shapes) else None
+                s_local, tx, ty, trims = slot_placement(current_shape, si)
+                left_trim, right_trim, bottom_trim, top_trim = trims
+
+                try:
+                    src_page.cropbox.lower_left  = (left_trim, bottom_trim)
+                    src_page.cropbox.upper_right = (W - right_trim, H - top_trim)
+                except Exception:
+                    pass
+
+                t = Transformation().scale(s_local).translate(tx, ty)
+                if composition == "xobject":
+                    bbox = (left_trim, bottom_trim, W - right_trim, H - top_trim)
+                    placements.append((f"/CushionSlot{si}", _page_form(writer, src_page, bbox), t.ctm, bbox))
+                else:
+                    new_page.merge_transformed_page(src_page, t)
+            if placements:
+                _place_forms(writer, new_page, placements)
+        mark = observe_stage("merge", "merge", mark)
+
+        if isinstance(out, str):
+            with open(out, "wb") as f_out:
+                writer.write(f_out)
+            _count_io(stats, "disk_bytes_written", os.path.getsize(out))
+        else:
+            writer.write(out)
+        observe_stage("merge", "write", mark)
+    finally:
+        # Cleanup raw and base layout files (no-op for in-memory buffers)
+        _remove_target(raw_target)
+        _remove_target(base_target)
+
+
+def build_single_pass_pdf(data, out, stats=None, parallel=None):
+    # One reportlab pass: cover page, then each drawer paints into its slot
+    # through a translate/scale/clip that mirrors the crop + merge transform.
+    cushions = data['cushions']
+    mark = time.perf_counter()
+    shapes = [resolve_shape(cushion) for cushion in cushions]
+
+    c = canvas.Canvas(out, pagesize=letter)
+    draw_cover_page(c, data['customer_name'], data['order_id'], data['email'],
+                    data['shipping_address'], data['billing_address'])
+    c.showPage()
+
+    logger.debug(f"Processing {len(cushions)} cushions")
+    # Cushions that share a diagram are drawn once into a Form XObject
+    # and every slot that needs it just places the form.
+    keys = [diagram_key(cushion, shape) for cushion, shape in zip(cushions, shapes)]
+    key_counts = {}
+    for key in keys:
+        key_counts[key] = key_counts.get(key, 0) + 1
+    form_names = {}
+    mark = observe_stage("single_pass", "prepare", mark)
+
+    # Big orders run their drawers across the render pool up front; the
+    # slots below then only replay the recorded fragments, in order.
+    fragments = None
+    if parallel is None:
+        parallel = (PARALLEL_WORKERS > 1 and PARALLEL_MIN_CUSHIONS > 0
+                    and len(cushions) >= PARALLEL_MIN_CUSHIONS)
+    if parallel:
+        fragments = prerender_diagrams(cushions, keys)
+        mark = observe_stage("single_pass", "prerender", mark)
+
+    total = len(cushions)
+    page_count = (total + slots_per_page - 1) // slots_per_page
+    for p in range(page_count):
+        for si in range(slots_per_page):
+            idx = p * slots_per_page + si
+            if idx >= total:
+                break
+            cushion = cushions[idx]
+            logger.debug(f"Processing cushion {idx+1}: {cushion.get('cushion_name', 'Unnamed')}")
+            shape = shapes[idx]
+            draw_specs_block(c, cushion, slots_top_y[si], shape)
+
+            key = keys[idx]
+            if key_counts[key] > 1 and key not in form_names:
+                form_name = "diagram_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+                c.beginForm(form_name)
+                draw_cached_diagram(SlotCanvas(c), cushion, key, fragments, shape, stats)
+                c.endForm()
+                form_names[key] = form_name
+
+            s_local, tx, ty, trims = slot_placement(shape, si)
+            left_trim, right_trim, bottom_trim, top_trim = trims
+            c.saveState()
+            c.translate(tx, ty)
+            c.scale(s_local, s_local)
+            clip = c.beginPath()
+            clip.rect(left_trim, bottom_trim, W - left_trim - right_trim, H - top_trim - bottom_trim)
+            c.clipPath(clip, stroke=0, fill=0)
+            if key in form_names:
+                c.doForm(form_names[key])
+            else:
+                draw_cached_diagram(SlotCanvas(c), cushion, key, fragments, shape, stats)
+            c.restoreState()
+        c.showPage()
+    mark = observe_stage("single_pass", "pages", mark)
+    c.save()
+    observe_stage("single_pass", "save", mark)
+    logger.debug("diagram cache", extra={"fields": DIAGRAM_CACHE.stats()})
+    if isinstance(out, str):
+        _count_io(stats, "disk_bytes_written", os.path.getsize(out))
+
+
+def build_confirmation_pdf(data, out, mode="merge", work_dir=None, stats=None):
+    """Render the confirmation for ``data`` into ``out`` (a path or binary file object).
+
+    Merge-mode intermediates are written to ``work_dir`` when given and kept
+    in memory otherwise. Disk traffic is tallied into ``stats`` as
+    ``disk_bytes_written`` / ``disk_bytes_read``.
+    """
+    if mode == "single_pass":
+        build_single_pass_pdf(data, out, stats)
+    elif mode == "merge":
+        build_merged_pdf(data, out, work_dir, stats)
+    else:
+        raise ValueError(f"Unknown render mode: {mode}")
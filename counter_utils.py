@@ -1,8 +1,33 @@
+import atexit
+import logging
 import os
+import sqlite3
+import threading
+import time
 
+# Legacy counter file; only read once to seed the database
 COUNTER_FILE = "counter.txt"
+# Durable total shared by every worker process
+COUNTER_DB = os.environ.get("COUNTER_DB", os.path.join(os.getcwd(), "counter.db"))
+# Pending increments are written after this many calls or this many seconds
+COUNTER_FLUSH_EVERY = int(os.environ.get("COUNTER_FLUSH_EVERY", 50))
+COUNTER_FLUSH_INTERVAL = float(os.environ.get("COUNTER_FLUSH_INTERVAL", 5))
 
-def read_counter():
+COUNTER_NAME = "api_calls"
+
+logger = logging.getLogger("confirmation.counter")
+
+_lock = threading.Lock()
+_pending = 0
+_flushing = 0  # increments swapped out of _pending and not yet written
+_total = None  # last total read back from the database
+_last_flush = 0.0
+_flusher = None
+_pid = None
+_schema_ready = False
+
+
+def read_counter_file():
     if not os.path.exists(COUNTER_FILE):
         return 0
     with open(COUNTER_FILE, 'r') as f:
@@ -11,8 +36,96 @@ def read_counter():
         except ValueError:
             return 0
 
+
+def _connect():
+    global _schema_ready
+    conn = sqlite3.connect(COUNTER_DB, timeout=30)
+    if not _schema_ready:
+        # Schema and the seed from the legacy file are set up once per process
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES (?, ?)",
+                         (COUNTER_NAME, read_counter_file()))
+        _schema_ready = True
+    return conn
+
+
+def _add(delta):
+    # One atomic UPDATE, so concurrent workers never lose increments; the
+    # SELECT shares its transaction (no UPDATE ... RETURNING before SQLite 3.35)
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (delta, COUNTER_NAME))
+            return conn.execute("SELECT value FROM counters WHERE name = ?", (COUNTER_NAME,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def flush_counter():
+    # Pending calls are swapped out under the lock and written outside it, so
+    # increment_counter never waits on the database
+    global _pending, _flushing, _total, _last_flush
+    with _lock:
+        delta = _pending
+        _pending = 0
+        _flushing += delta
+        _last_flush = time.monotonic()
+    try:
+        total = _add(delta)
+    except Exception as e:
+        with _lock:
+            _flushing -= delta
+            _pending += delta
+        logger.warning(f"Counter flush failed: {e}")
+        return _total
+    with _lock:
+        _flushing -= delta
+        # Concurrent flushes may return out of order; the shared total only grows
+        _total = total if _total is None else max(_total, total)
+    return _total
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(COUNTER_FLUSH_INTERVAL)
+        if _pending:
+            flush_counter()
+
+
+def _ensure_flusher():
+    # Started lazily so each forked worker gets its own thread
+    global _flusher, _pid, _pending, _flushing, _total
+    if _pid == os.getpid():
+        return
+    with _lock:
+        if _pid == os.getpid():
+            return
+        _pending = 0
+        _flushing = 0
+        _total = None
+        _flusher = threading.Thread(target=_flush_periodically, name="counter-flush", daemon=True)
+        _flusher.start()
+        _pid = os.getpid()
+
+
+def read_counter():
+    """Current total: the last flushed value plus this process's pending calls."""
+    if _total is None:
+        flush_counter()
+    return (_total or 0) + _pending + _flushing
+
+
 def increment_counter():
-    count = read_counter() + 1
-    with open(COUNTER_FILE, 'w') as f:
-        f.write(str(count))
-    return count
+    global _pending
+    _ensure_flusher()
+    with _lock:
+        _pending += 1
+        due = _pending >= COUNTER_FLUSH_EVERY or time.monotonic() - _last_flush >= COUNTER_FLUSH_INTERVAL
+    if due or _total is None:
+        flush_counter()
+    return read_counter()
+
+
+atexit.register(lambda: _pending and flush_counter())
@@ -0,0 +1,129 @@
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Coordinate changes; bounds are not tracked through them, so later calls are kept
+_TRANSFORMS = ("translate", "rotate", "scale", "transform", "skew")
+
+
+def _path_bounds(code):
+    """Bounding box of a PDF path operator string, or None if it has no points."""
+    xs, ys, nums = [], [], []
+    for token in code.split():
+        try:
+            nums.append(float(token))
+            continue
+        except ValueError:
+            pass
+        if token == "re" and len(nums) >= 4:
+            x, y, w, h = nums[-4:]
+            xs += [x, x + w]
+            ys += [y, y + h]
+        elif token in ("m", "l", "c", "v", "y"):
+            xs += nums[0::2]
+            ys += nums[1::2]
+        nums = []
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class CropFilterCanvas:
+    """Canvas proxy that drops drawing calls landing entirely outside ``window``.
+
+    ``window`` is (x0, y0, x1, y1) in page coordinates: the part of a drawer's
+    page that survives the crop. Bounds are padded by the line width and
+    a margin, and anything drawn under a translate/rotate/scale is kept,
+    so only operators that cannot show are dropped. ``stripped`` and
+    ``kept`` count the drawing calls.
+    """
+
+    MARGIN = 2.0
+
+    def __init__(self, canv, window):
+        self._canv = canv
+        self._window = window
+        self._font = ("Helvetica", 12)
+        self._line_width = 1.0
+        self._transformed = False
+        self._stack = []
+        self.kept = 0
+        self.stripped = 0
+
+    def _visible(self, x0, y0, x1, y1):
+        pad = self._line_width + self.MARGIN
+        wx0, wy0, wx1, wy1 = self._window
+        return (min(x0, x1) - pad <= wx1 and max(x0, x1) + pad >= wx0
+                and min(y0, y1) - pad <= wy1 and max(y0, y1) + pad >= wy0)
+
+    def _draw(self, name, bounds, args, kwargs):
+        if self._transformed or bounds is None or self._visible(*bounds):
+            self.kept += 1
+            return getattr(self._canv, name)(*args, **kwargs)
+        self.stripped += 1
+
+    def _text_bounds(self, x, y, text, align):
+        font_name, size = self._font
+        width = stringWidth(str(text), font_name, size)
+        left = x - width * align
+        return left, y - size * 0.5, left + width, y + size * 1.2
+
+    # State
+
+    def setFont(self, psfontname, size, *args, **kwargs):
+        self._font = (psfontname, size)
+        return self._canv.setFont(psfontname, size, *args, **kwargs)
+
+    def setLineWidth(self, width):
+        self._line_width = width
+        return self._canv.setLineWidth(width)
+
+    def saveState(self):
+        self._stack.append((self._font, self._line_width, self._transformed))
+        return self._canv.saveState()
+
+    def restoreState(self):
+        if self._stack:
+            self._font, self._line_width, self._transformed = self._stack.pop()
+        return self._canv.restoreState()
+
+    # Drawing
+
+    def drawString(self, x, y, text, *args, **kwargs):
+        return self._draw("drawString", self._text_bounds(x, y, text, 0), (x, y, text) + args, kwargs)
+
+    def drawCentredString(self, x, y, text, *args, **kwargs):
+        return self._draw("drawCentredString", self._text_bounds(x, y, text, 0.5), (x, y, text) + args, kwargs)
+
+    def drawRightString(self, x, y, text, *args, **kwargs):
+        return self._draw("drawRightString", self._text_bounds(x, y, text, 1), (x, y, text) + args, kwargs)
+
+    def line(self, x1, y1, x2, y2):
+        return self._draw("line", (x1, y1, x2, y2), (x1, y1, x2, y2), {})
+
+    def lines(self, linelist):
+        linelist = list(linelist)
+        if not linelist:
+            return None
+        bounds = (min(min(l[0], l[2]) for l in linelist), min(min(l[1], l[3]) for l in linelist),
+                  max(max(l[0], l[2]) for l in linelist), max(max(l[1], l[3]) for l in linelist))
+        return self._draw("lines", bounds, (linelist,), {})
+
+    def rect(self, x, y, width, height, *args, **kwargs):
+        return self._draw("rect", (x, y, x + width, y + height), (x, y, width, height) + args, kwargs)
+
+    def circle(self, x_cen, y_cen, r, *args, **kwargs):
+        return self._draw("circle", (x_cen - r, y_cen - r, x_cen + r, y_cen + r), (x_cen, y_cen, r) + args, kwargs)
+
+    def arc(self, x1, y1, x2, y2, *args, **kwargs):
+        return self._draw("arc", (x1, y1, x2, y2), (x1, y1, x2, y2) + args, kwargs)
+
+    def drawPath(self, aPath, *args, **kwargs):
+        return self._draw("drawPath", _path_bounds(aPath.getCode()), (aPath,) + args, kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self._canv, name)
+        if name in _TRANSFORMS:
+            def transform(*args, **kwargs):
+                self._transformed = True
+                return attr(*args, **kwargs)
+            return transform
+        return attr
@@ -1,27 +1,13 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import black,blue,green,red
+import logging
 import math
+from text_layout import draw_wrapped_text
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
-
-def draw_curved(c, cushion):
+REQUIRED_DIMENSIONS = ("width", "side_length", "middle_length")
+
+def draw_curved(c, cushion, diagram_only=False):
     page_width, page_height = letter
 
     # --- pull in your specs ---
@@ -40,8 +26,9 @@ def draw_curved(c, cushion):
     # --- header and spec table ---
     left_x = inch
     y = page_height - inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{cushion_name} (Qty: {quantity})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{cushion_name} (Qty: {quantity})")
     y -= 0.4 * inch
 
     specs = [
@@ -57,13 +44,14 @@ def draw_curved(c, cushion):
     # y = page_height - 3 * inch # Adjusted initial y position for specs
     
 
-    for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
-        max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
-        y -= 4  # extra spacing between spec rows
+    if not diagram_only:
+        for label, value in specs:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+            y -= 4  # extra spacing between spec rows
 
     # --- compute scale so it fits on the page ---
     diagram_w = page_width  / 2.0
@@ -245,7 +233,7 @@ def draw_curved(c, cushion):
 
     else:
         # unexpected option
-        print(f"Warning: unrecognized ties option: {ties!r}")
+        logging.getLogger(__name__).warning(f"unrecognized ties option: {ties!r}")
 
 
 
@@ -0,0 +1,120 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.pathobject import PDFPathObject
+
+# Memory budget for cached diagrams, in bytes (0 disables the cache)
+DIAGRAM_CACHE_BYTES = int(os.environ.get("DIAGRAM_CACHE_BYTES", 16 * 1024 * 1024))
+
+# Canvas calls that take a path object; the path is stored as its PDF operators
+_PATH_OPS = ("drawPath", "clipPath")
+
+
+class DiagramRecorder:
+    """Canvas stand-in that records a drawer's calls as a replayable fragment.
+
+    Paths are snapshotted to their operator string when drawn, so the
+    fragment holds no live reportlab objects and can be pickled.
+    """
+
+    def __init__(self):
+        self.ops = []
+        self._fontname = "Helvetica"
+        self._fontsize = 12
+
+    def beginPath(self):
+        return PDFPathObject()
+
+    def setFont(self, psfontname, size, leading=None):
+        self._fontname = psfontname
+        self._fontsize = size
+        self.ops.append(("setFont", (psfontname, size, leading), {}))
+
+    def stringWidth(self, text, fontName=None, fontSize=None):
+        return stringWidth(text, fontName or self._fontname,
+                           self._fontsize if fontSize is None else fontSize)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            if name in _PATH_OPS:
+                args = (args[0].getCode(),) + args[1:]
+            self.ops.append((name, args, kwargs))
+        return record
+
+
+def replay_diagram(c, ops):
+    for name, args, kwargs in ops:
+        if name in _PATH_OPS:
+            args = (PDFPathObject(code=[args[0]]),) + args[1:]
+        getattr(c, name)(*args, **kwargs)
+
+
+class DiagramCache:
+    """Thread-safe LRU of recorded diagrams bounded by an approximate byte budget."""
+
+    def __init__(self, max_bytes=DIAGRAM_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (ops, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, ops):
+        ops = tuple(ops)
+        size = len(pickle.dumps(ops, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (ops, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+DIAGRAM_CACHE = DiagramCache()
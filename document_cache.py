@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# How long an identical order keeps returning the same file, in seconds (0 disables the cache)
+DOCUMENT_CACHE_TTL = float(os.environ.get("DOCUMENT_CACHE_TTL", 3600))
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.environ.get("DOCUMENT_CACHE_MAX_ENTRIES", 1024))
+
+# Payload fields that reach the rendered PDF; anything else is ignored for the key
+ORDER_FIELDS = ("customer_name", "order_id", "email", "shipping_address", "billing_address", "cushions")
+
+
+def order_cache_key(data, render_mode):
+    normalized = {k: data.get(k) for k in ORDER_FIELDS}
+    normalized["render_mode"] = render_mode
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """Maps a normalized order payload to the confirmation file already rendered for it."""
+
+    def __init__(self, ttl=DOCUMENT_CACHE_TTL, max_entries=DOCUMENT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (filepath, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                filepath, stored_at = entry
+                # Expired, or the file was removed behind our back
+                if now - stored_at > self.ttl or not os.path.exists(filepath):
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, filepath):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (filepath, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+DOCUMENT_CACHE = DocumentCache()
@@ -0,0 +1,45 @@
+import gzip
+import hashlib
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FORM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "form.html")
+
+
+class IndexPage:
+    """form.html compiled and rendered once, with gzip/brotli bodies built up front.
+
+    With ``reload`` set (debug mode) the file's mtime is checked on every
+    request and the page is rebuilt when it changes.
+    """
+
+    def __init__(self, path=FORM_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._built = None  # (mtime, {encoding: body}, etag)
+
+    def _build(self, jinja_env):
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            source = f.read()
+        body = jinja_env.from_string(source).render().encode("utf-8")
+        bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies["br"] = brotli.compress(body)
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        return mtime, bodies, etag
+
+    def get(self, jinja_env, reload=False):
+        """Return ({encoding: body}, etag), rebuilding first if needed."""
+        built = self._built
+        if built is None or (reload and os.path.getmtime(self.path) != built[0]):
+            with self._lock:
+                built = self._built
+                if built is None or (reload and os.path.getmtime(self.path) != built[0]):
+                    built = self._built = self._build(jinja_env)
+        return built[1], built[2]
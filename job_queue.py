@@ -0,0 +1,202 @@
+import io
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from confirmation_pdf import build_confirmation_pdf, save_pdf_bytes
+from log_utils import request_id_var, setup_logging
+from pdf_storage import register_pdf
+
+# Job state lives in SQLite so every gunicorn worker can answer GET /jobs/<id>
+JOBS_DB = os.environ.get("JOBS_DB", os.path.join(os.getcwd(), "jobs.db"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# How pool workers are started; a fork of this threaded server can inherit a
+# lock another thread was holding, forkserver and spawn start them clean
+JOB_START_METHOD = os.environ.get("JOB_START_METHOD", "forkserver")
+# Jobs and batch orders queued or running in this process before new submissions are refused
+JOB_QUEUE_LIMIT = int(os.environ.get("JOB_QUEUE_LIMIT", 64))
+# Orders of one batch on the pool at a time, so async jobs queued meanwhile are not stuck behind it
+BATCH_IN_FLIGHT = int(os.environ.get("BATCH_IN_FLIGHT", JOB_WORKERS))
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION = float(os.environ.get("JOB_RETENTION", 24 * 3600))
+
+_executor = None
+_executor_lock = threading.Lock()
+_slot_freed = threading.Condition(_executor_lock)
+_in_flight = 0
+_schema_ready = False
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _connect():
+    global _schema_ready
+    conn = sqlite3.connect(JOBS_DB, timeout=30)
+    if not _schema_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, state TEXT NOT NULL, filename TEXT, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        _schema_ready = True
+    return conn
+
+
+def _set_state(job_id, state, error=None):
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE id = ?",
+                         (state, error, time.time(), job_id))
+    finally:
+        conn.close()
+
+
+def run_render_job(job_id, data, filepath, render_mode, in_memory, work_dir):
+    # Runs inside a pool process
+    request_id_var.set(job_id)
+    _set_state(job_id, "running")
+    try:
+        pdf_bytes = None
+        if in_memory:
+            pdf_buffer = io.BytesIO()
+            build_confirmation_pdf(data, pdf_buffer, mode=render_mode)
+            pdf_bytes = pdf_buffer.getvalue()
+            save_pdf_bytes(filepath, pdf_bytes)
+        else:
+            build_confirmation_pdf(data, filepath, mode=render_mode, work_dir=work_dir)
+        register_pdf(filepath, pdf_bytes)
+    except Exception as e:
+        _set_state(job_id, "failed", str(e))
+        raise
+    _set_state(job_id, "done")
+    return filepath
+
+
+def render_pdf_bytes(data, render_mode="merge", request_id="-"):
+    # Runs inside a pool process
+    request_id_var.set(request_id)
+    pdf_buffer = io.BytesIO()
+    build_confirmation_pdf(data, pdf_buffer, mode=render_mode)
+    return pdf_buffer.getvalue()
+
+
+def render_batch(orders, render_mode="merge"):
+    """Render every order on the worker pool; returns [(pdf_bytes, error)] in input order.
+
+    Each order holds a queue slot while it is on the pool. Raises
+    QueueFullError when no slot is free for the first one.
+    """
+    request_id = request_id_var.get()
+    futures = []
+    running = set()
+    for data in orders:
+        if len(running) >= BATCH_IN_FLIGHT:
+            _, running = wait(running, return_when=FIRST_COMPLETED)
+        _take_slot(block=bool(futures))
+        try:
+            future = _submit(render_pdf_bytes, data, render_mode, request_id)
+        except BrokenProcessPool as e:
+            future = Future()
+            future.set_exception(e)
+        futures.append(future)
+        running.add(future)
+    results = []
+    for future in futures:
+        try:
+            results.append((future.result(), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None or _executor._broken:
+            # A worker died (OOM kill, crash); the old pool refuses all work
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS,
+                                            mp_context=multiprocessing.get_context(JOB_START_METHOD),
+                                            initializer=setup_logging)
+        return _executor
+
+
+def _take_slot(block=False):
+    global _in_flight
+    with _slot_freed:
+        while _in_flight >= JOB_QUEUE_LIMIT:
+            if not block:
+                raise QueueFullError(f"Render queue is full ({JOB_QUEUE_LIMIT} jobs)")
+            _slot_freed.wait()
+        _in_flight += 1
+
+
+def _job_finished(future):
+    global _in_flight
+    with _slot_freed:
+        _in_flight -= 1
+        _slot_freed.notify()
+
+
+def _submit(fn, *args):
+    # The caller holds a queue slot; it is given back when the future is done
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _job_finished(None)
+        raise
+    future.add_done_callback(_job_finished)
+    return future
+
+
+def _fail_lost_job(job_id, future):
+    # run_render_job records its own failures; a job whose worker died never got to
+    if isinstance(future.exception(), BrokenProcessPool):
+        _set_state(job_id, "failed", str(future.exception()))
+
+
+def submit_job(data, filepath, render_mode="merge", in_memory=False, work_dir=None):
+    """Queue a confirmation render and return (job_id, future)."""
+    _take_slot()
+
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE updated_at < ? AND state IN ('done', 'failed')",
+                         (now - JOB_RETENTION,))
+            conn.execute("INSERT INTO jobs (id, state, filename, error, created_at, updated_at) VALUES (?, ?, ?, NULL, ?, ?)",
+                         (job_id, "queued", os.path.basename(filepath), now, now))
+    finally:
+        conn.close()
+
+    try:
+        future = _submit(run_render_job, job_id, data, filepath, render_mode, in_memory, work_dir)
+    except Exception as e:
+        _set_state(job_id, "failed", str(e))
+        raise
+    future.add_done_callback(lambda f: _fail_lost_job(job_id, f))
+    return job_id, future
+
+
+def get_job(job_id):
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT id, state, filename, error, created_at, updated_at FROM jobs WHERE id = ?",
+                           (job_id,)).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    keys = ("id", "state", "filename", "error", "created_at", "updated_at")
+    return dict(zip(keys, row))
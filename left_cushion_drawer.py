@@ -3,7 +3,9 @@ from reportlab.lib.units import inch
 from reportlab.lib.colors import black, red, blue
 import math
 
-def draw_left_cushion(c, cushion):
+REQUIRED_DIMENSIONS = ("top_width", "bottom_width", "length")
+
+def draw_left_cushion(c, cushion, diagram_only=False):
     # ─── Unpack & Header ───
     page_w, page_h = letter
     name           = cushion.get("cushion_name",   "Left Window Cushions")
@@ -19,8 +21,9 @@ def draw_left_cushion(c, cushion):
 
     left_x = inch
     y      = page_h - inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{name} (Qty: {qty})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{name} (Qty: {qty})")
     y -= 0.4 * inch
 
     # ─── Specs table ───
@@ -36,10 +39,12 @@ def draw_left_cushion(c, cushion):
         ("Fabric",          fabric)
     ]
     for label, val in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
-        c.drawString(left_x + 130, y, val)
+        # Rows are fixed height, and the diagram is sized from where they end
+        if not diagram_only:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            c.drawString(left_x + 130, y, val)
         y -= 0.3 * inch
 
     # ─── Compute scale & corners ───
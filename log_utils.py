@@ -0,0 +1,108 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Request headers and bodies are only ever logged when this is on; set 0 in production
+LOG_PAYLOADS = os.environ.get("LOG_PAYLOADS", "1") == "1"
+# Request headers never written out, compared case-insensitively
+REDACTED_HEADERS = ("authorization", "cookie", "x-profile-token")
+# Fraction of sampled records (the payload dumps) kept at each level
+LOG_SAMPLE_RATES = os.environ.get("LOG_SAMPLE_RATES", "DEBUG=1,INFO=0.1")
+
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+_handler = None
+_listener = None
+
+
+def _parse_rates(spec):
+    rates = {}
+    for part in spec.split(","):
+        if "=" in part:
+            level, rate = part.split("=", 1)
+            rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+class RequestIdFilter(logging.Filter):
+    # Runs in the caller's thread before the record is queued, so it sees that request's id
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a per-level fraction of records logged with ``extra={"sample": True}``."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if not getattr(record, "sample", False):
+            return True
+        return random.random() < self.rates.get(record.levelno, 1.0)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        return json.dumps(entry, default=str)
+
+
+def _start_listener():
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _handler.queue = log_queue
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging():
+    """Send every log record through a queue to one JSON-lines stdout writer thread."""
+    global _handler
+    if _handler is not None:
+        return
+    _handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    _handler.addFilter(RequestIdFilter())
+    _handler.addFilter(SamplingFilter(_parse_rates(LOG_SAMPLE_RATES)))
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    _start_listener()
+    atexit.register(_stop_listener)
+    # A forked worker (gunicorn, render pools) has the queue but not the
+    # writer thread, so it starts its own
+    os.register_at_fork(after_in_child=_start_listener)
+
+
+def log_payload(logger, headers, data):
+    """Dump a request's headers (DEBUG) and body (INFO), sampled, unless LOG_PAYLOADS is off."""
+    if not LOG_PAYLOADS:
+        return
+    headers = {k: "[redacted]" if k.lower() in REDACTED_HEADERS else v for k, v in headers.items()}
+    logger.debug("request headers", extra={"sample": True, "fields": {"headers": headers}})
+    logger.info("request payload", extra={"sample": True, "fields": {"payload": data}})
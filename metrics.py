@@ -0,0 +1,130 @@
+import threading
+import time
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CUSHION_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+REGISTRY = []
+
+
+def _label_text(labelnames, labelvalues, extra=""):
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labelvalues)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class Gauge:
+    """A value read from ``callback`` at scrape time."""
+
+    def __init__(self, name, help_text, callback):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        REGISTRY.append(self)
+
+    def render(self):
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_number(value)}"]
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    le = f'le="{_format_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {total!r}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {count}")
+        return lines
+
+
+REQUESTS = Counter("confirmation_requests_total", "HTTP requests handled.", ("endpoint", "status"))
+ERRORS = Counter("confirmation_errors_total", "Requests or batch orders that failed.", ("endpoint",))
+REQUEST_SECONDS = Histogram("confirmation_request_seconds", "Time spent handling a request.", ("endpoint",))
+STAGE_SECONDS = Histogram("confirmation_stage_seconds", "Time spent in each PDF build stage.",
+                          ("render_mode", "stage"))
+DRAWER_SECONDS = Histogram("confirmation_drawer_seconds", "Time spent in one drawer call.", ("shape",))
+HIDDEN_OPS_STRIPPED = Counter("confirmation_hidden_ops_stripped_total",
+                              "Drawer calls dropped because the crop would hide them.", ("shape",))
+CUSHIONS_PER_ORDER = Histogram("confirmation_cushions_per_order", "Cushions in each rendered order.",
+                                buckets=CUSHION_BUCKETS)
+
+
+def observe_stage(render_mode, stage, started):
+    """Record the time since ``started`` for ``stage`` and return the current time."""
+    now = time.perf_counter()
+    STAGE_SECONDS.observe(now - started, render_mode=render_mode, stage=stage)
+    return now
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
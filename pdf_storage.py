@@ -0,0 +1,252 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from metrics import Counter, Gauge
+
+PDF_DIR = os.environ.get("PDF_DIR", os.path.join(os.getcwd(), "pdfs"))
+# Index of stored confirmations (size, age, last access) used for eviction.
+# Keep it outside PDF_DIR: everything in there is served under /pdfs/
+PDF_INDEX_DB = os.environ.get("PDF_INDEX_DB", os.path.join(os.getcwd(), "pdf_index.db"))
+# Evict least recently served files once PDF_DIR holds more than this (0 = no limit)
+PDF_STORAGE_MAX_BYTES = int(os.environ.get("PDF_STORAGE_MAX_BYTES", 5 * 1024 ** 3))
+# Files older than this many seconds are removed (0 = keep forever)
+PDF_RETENTION = float(os.environ.get("PDF_RETENTION", 30 * 24 * 3600))
+PDF_EVICT_INTERVAL = float(os.environ.get("PDF_EVICT_INTERVAL", 300))
+# Serving a file refreshes its LRU position at most this often, in seconds
+_TOUCH_INTERVAL = 60
+# The only names new_pdf_name hands out, and so the only ones served
+_CONFIRMATION_NAME = re.compile(r"confirmation_[0-9a-f]{32}\.pdf")
+
+logger = logging.getLogger("confirmation.storage")
+
+EVICTIONS = Counter("confirmation_pdf_evictions_total", "Stored PDFs removed by retention.", ("reason",))
+RECLAIMED_BYTES = Counter("confirmation_pdf_reclaimed_bytes_total", "Bytes freed by evicting stored PDFs.",
+                          ("reason",))
+
+_schema_ready = False
+_evictor = None
+_evictor_lock = threading.Lock()
+
+
+def _connect():
+    global _schema_ready
+    conn = sqlite3.connect(PDF_INDEX_DB, timeout=30)
+    if not _schema_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pdfs ("
+            " filename TEXT PRIMARY KEY, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL, etag TEXT)"
+        )
+        try:
+            conn.execute("ALTER TABLE pdfs ADD COLUMN etag TEXT")
+        except sqlite3.OperationalError:
+            pass  # already there
+        conn.execute("CREATE INDEX IF NOT EXISTS pdfs_last_access ON pdfs (last_access)")
+        # Serving used to index any file found in PDF_DIR, the index database included
+        with conn:
+            conn.execute("DELETE FROM pdfs WHERE filename NOT GLOB 'confirmation_*.pdf'")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                _index_existing(conn)
+                conn.execute("PRAGMA user_version = 1")
+        _schema_ready = True
+    return conn
+
+
+def _index_existing(conn):
+    # Files stored before this index existed (flat legacy files, shards indexed
+    # elsewhere) would otherwise never count against the budget or expire
+    rows = []
+    for dirpath, _, filenames in os.walk(PDF_DIR):
+        for filename in filenames:
+            if not _CONFIRMATION_NAME.fullmatch(filename):
+                continue
+            try:
+                st = os.stat(os.path.join(dirpath, filename))
+            except FileNotFoundError:
+                continue
+            rows.append((filename, st.st_size, st.st_mtime, st.st_mtime))
+    conn.executemany("INSERT OR IGNORE INTO pdfs (filename, size, created_at, last_access, etag)"
+                     " VALUES (?, ?, ?, ?, NULL)", rows)
+
+
+def pdf_path(filename):
+    # Two levels of 256 hashed subdirectories keep every directory small
+    digest = hashlib.sha1(filename.encode("utf-8")).hexdigest()
+    return os.path.join(PDF_DIR, digest[:2], digest[2:4], filename)
+
+
+def new_pdf_name():
+    return f"confirmation_{uuid.uuid4().hex}.pdf"
+
+
+def new_pdf_path(filename=None):
+    """Return (filename, filepath) for a new confirmation, creating its shard directory."""
+    filename = filename or new_pdf_name()
+    filepath = pdf_path(filename)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    return filename, filepath
+
+
+def content_etag(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()[:32]
+
+
+def _file_etag(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def register_pdf(filepath, pdf_bytes=None):
+    # Stored files never change, so their content hash is computed once here
+    # and served as a strong ETag
+    etag = content_etag(pdf_bytes) if pdf_bytes is not None else _file_etag(filepath)
+    now = time.time()
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO pdfs (filename, size, created_at, last_access, etag)"
+                         " VALUES (?, ?, ?, ?, ?)",
+                         (os.path.basename(filepath), os.path.getsize(filepath), now, now, etag))
+    finally:
+        conn.close()
+
+
+def resolve_pdf(filename):
+    """Return (path, etag) of a stored confirmation, or None.
+
+    Files from before sharding live in PDF_DIR itself and are indexed on first use.
+    Names other than confirmation_<hex>.pdf are never looked up.
+    """
+    filename = os.path.basename(filename)
+    if not _CONFIRMATION_NAME.fullmatch(filename):
+        return None
+    filepath = pdf_path(filename)
+    if not os.path.isfile(filepath):
+        filepath = os.path.join(PDF_DIR, filename)
+        if not os.path.isfile(filepath):
+            return None
+    now = time.time()
+    conn = _connect()
+    try:
+        with conn:
+            row = conn.execute("SELECT etag FROM pdfs WHERE filename = ?", (filename,)).fetchone()
+            if row is None or row[0] is None:
+                etag = _file_etag(filepath)
+                conn.execute("INSERT OR REPLACE INTO pdfs (filename, size, created_at, last_access, etag)"
+                             " VALUES (?, ?, ?, ?, ?)",
+                             (filename, os.path.getsize(filepath), os.path.getmtime(filepath), now, etag))
+            else:
+                etag = row[0]
+                conn.execute("UPDATE pdfs SET last_access = ? WHERE filename = ? AND last_access < ?",
+                             (now, filename, now - _TOUCH_INTERVAL))
+    finally:
+        conn.close()
+    return filepath, etag
+
+
+def stored_bytes():
+    conn = _connect()
+    try:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM pdfs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _unlink(filename):
+    # True once the file is gone; any other error leaves it indexed for the next sweep
+    for filepath in (pdf_path(filename), os.path.join(PDF_DIR, filename)):
+        try:
+            os.remove(filepath)
+            return True
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Could not evict {filename}: {e}")
+            return False
+    return True
+
+
+def _remove(rows, reason):
+    # Files are unlinked outside any transaction, so register_pdf is never
+    # blocked by a large sweep; only rows of files actually gone are dropped
+    gone = []
+    reclaimed = 0
+    evicted = 0
+    for filename, size in rows:
+        if not _CONFIRMATION_NAME.fullmatch(filename):
+            # Never delete anything but a confirmation, whatever the index says
+            gone.append((filename,))
+        elif _unlink(filename):
+            gone.append((filename,))
+            reclaimed += size
+            evicted += 1
+    if gone:
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM pdfs WHERE filename = ?", gone)
+        finally:
+            conn.close()
+    if evicted:
+        EVICTIONS.inc(evicted, reason=reason)
+        RECLAIMED_BYTES.inc(reclaimed, reason=reason)
+    return reclaimed
+
+
+def _select(sql, params=()):
+    conn = _connect()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def evict_pdfs():
+    """Remove expired files, then least recently served ones until under the byte budget."""
+    reclaimed = 0
+    if PDF_RETENTION > 0:
+        rows = _select("SELECT filename, size FROM pdfs WHERE created_at < ?", (time.time() - PDF_RETENTION,))
+        reclaimed += _remove(rows, "ttl")
+    if PDF_STORAGE_MAX_BYTES > 0:
+        excess = _select("SELECT COALESCE(SUM(size), 0) FROM pdfs")[0][0] - PDF_STORAGE_MAX_BYTES
+        if excess > 0:
+            rows = []
+            for filename, size in _select("SELECT filename, size FROM pdfs ORDER BY last_access"):
+                if excess <= 0:
+                    break
+                rows.append((filename, size))
+                excess -= size
+            reclaimed += _remove(rows, "size")
+    if reclaimed:
+        logger.info("evicted stored PDFs", extra={"fields": {"reclaimed_bytes": reclaimed}})
+    return reclaimed
+
+
+def _evict_periodically():
+    while True:
+        try:
+            evict_pdfs()
+        except Exception:
+            logger.exception("PDF eviction failed")
+        time.sleep(PDF_EVICT_INTERVAL)
+
+
+def start_evictor():
+    global _evictor
+    with _evictor_lock:
+        if _evictor is None or not _evictor.is_alive():
+            _evictor = threading.Thread(target=_evict_periodically, name="pdf-evictor", daemon=True)
+            _evictor.start()
+
+
+os.makedirs(PDF_DIR, exist_ok=True)
+Gauge("confirmation_pdf_stored_bytes", "Bytes of confirmations kept in PDF_DIR.", stored_bytes)
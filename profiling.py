@@ -0,0 +1,145 @@
+import cProfile
+import contextlib
+import hmac
+import json
+import logging
+import os
+import pstats
+import re
+import shutil
+import threading
+import time
+import tracemalloc
+
+# Profiles are written here, one directory per request id
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.getcwd(), "profiles"))
+# Requests sending this value in X-Profile-Token are profiled (empty = header ignored)
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+# Profile every confirmation request; cProfile slows renders noticeably, so debugging only
+PROFILE_ALL = os.environ.get("PROFILE_ALL", "0") == "1"
+# Also trace allocations with tracemalloc (per request: X-Profile-Memory: 1)
+PROFILE_MEMORY = os.environ.get("PROFILE_MEMORY", "0") == "1"
+# Newest profiles kept on disk, and functions/allocation sites summarised for each
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", 15))
+
+logger = logging.getLogger("confirmation.profiling")
+
+# One profile at a time: tracemalloc is process-wide and overlapping
+# profiles would charge each other's work to the wrong request
+_active = threading.Lock()
+
+
+def is_admin(token):
+    # compare_digest only takes ASCII str, and header values may hold any character
+    return (bool(PROFILE_TOKEN) and token is not None
+            and hmac.compare_digest(token.encode("utf-8"), PROFILE_TOKEN.encode("utf-8")))
+
+
+def profile_path(request_id):
+    # Request ids may come from the client, so keep them to one safe path component
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", request_id).strip(".") or "request"
+    return os.path.join(PROFILE_DIR, name[:64])
+
+
+def top_functions(stats, limit=PROFILE_TOP):
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        "function": f"{os.path.basename(filename)}:{line}({name})",
+        "calls": calls,
+        "tottime_s": round(tottime, 6),
+        "cumtime_s": round(cumtime, 6),
+    } for (filename, line, name), (_, calls, tottime, cumtime, _) in rows]
+
+
+def top_allocations(snapshot, limit=PROFILE_TOP):
+    return [{
+        "site": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+        "bytes": stat.size,
+        "blocks": stat.count,
+    } for stat in snapshot.statistics("lineno")[:limit]]
+
+
+@contextlib.contextmanager
+def profile_request(request_id, endpoint, memory=False):
+    """Profile the block and save it under PROFILE_DIR/<request_id>.
+
+    Yields True when profiling, False when another profile is already running.
+    Only this thread is profiled, not work handed to process pools.
+    """
+    if not _active.acquire(blocking=False):
+        logger.warning("profile skipped, another one is running")
+        yield False
+        return
+    try:
+        started_tracing = memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if memory:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        created = time.time()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield True
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = peak = None
+            if memory:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            try:
+                _save(request_id, endpoint, profiler, snapshot, peak, created, elapsed)
+            except Exception:
+                logger.exception("could not save profile")
+    finally:
+        _active.release()
+
+
+def _save(request_id, endpoint, profiler, snapshot, peak, created, elapsed):
+    directory = profile_path(request_id)
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, "profile.pstats"))
+    meta = {
+        "request_id": request_id,
+        "endpoint": endpoint,
+        "created": created,
+        "seconds": round(elapsed, 6),
+        "top_cumulative": top_functions(pstats.Stats(profiler)),
+    }
+    if snapshot is not None:
+        snapshot.dump(os.path.join(directory, "memory.snapshot"))
+        meta["memory"] = {"peak_bytes": peak, "top_allocations": top_allocations(snapshot)}
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    logger.info("profile saved", extra={"fields": {"path": directory, "seconds": meta["seconds"]}})
+    _prune()
+
+
+def _profile_dirs():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    dirs = [os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR)]
+    dirs = [d for d in dirs if os.path.isfile(os.path.join(d, "meta.json"))]
+    return sorted(dirs, key=lambda d: os.path.getmtime(os.path.join(d, "meta.json")), reverse=True)
+
+
+def _prune():
+    for directory in _profile_dirs()[PROFILE_KEEP:]:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def list_profiles(limit=20):
+    """Saved profiles, newest first, each with its top cumulative functions."""
+    profiles = []
+    for directory in _profile_dirs()[:limit]:
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
@@ -1,32 +1,18 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import red, black, blue, green
+import logging
+from text_layout import draw_wrapped_text
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
-
-def draw_rectangle(c, cushion):
+REQUIRED_DIMENSIONS = ("width", "length", "thickness")
+
+def draw_rectangle(c, cushion, diagram_only=False):
     page_width, page_height = letter
     if 'zipper' not in cushion:
             # This part of the code will not be reached because the function is designed to generate PDFs,
             # not return Flask responses. However, I will keep the logic here to illustrate the intended check.
             # return jsonify({"error": "Zipper position is required for all cushions."}), 400
-            print("Error: Zipper position is required for all cushions.")
+            logging.getLogger(__name__).error("Zipper position is required for all cushions.")
             return
 
     cushion_name = cushion.get('cushion_name', 'Cushion Specifications')
@@ -73,8 +59,9 @@ def draw_rectangle(c, cushion):
 
     left_x = 1 * inch
     y = page_height - 1 * inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
     y -= 0.4 * inch
 
     specs = [
@@ -93,13 +80,14 @@ def draw_rectangle(c, cushion):
     # y = page_height - 3 * inch # Adjusted initial y position for specs
     
 
-    for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
-        max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
-        y -= 4  # extra spacing between spec rows
+    if not diagram_only:
+        for label, value in specs:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+            y -= 4  # extra spacing between spec rows
 
     diagram_width = page_width / 2.0
     diagram_height = page_height / 3.0
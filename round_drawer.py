@@ -2,27 +2,12 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import black, red, blue, green
 from math import pi, cos, sin
+from text_layout import draw_wrapped_text
+import arc_geometry
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
-
-
-def draw_round(c, cushion):
+REQUIRED_DIMENSIONS = ("diameter", "thickness")
+
+def draw_round(c, cushion, diagram_only=False):
     page_width, page_height = letter
 
     cushion_name = cushion.get('cushion_name', 'Round Cushion')
@@ -38,8 +23,9 @@ def draw_round(c, cushion):
 
     left_x = 1 * inch
     y = page_height - 1 * inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
     y -= 0.4 * inch
 
     specs = [
@@ -56,13 +42,14 @@ def draw_round(c, cushion):
     # y = page_height - 3 * inch # Adjusted initial y position for specs
     
 
-    for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
-        max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
-        y -= 4  # extra spacing between spec rows 
+    if not diagram_only:
+        for label, value in specs:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+            y -= 4  # extra spacing between spec rows
 
     # Draw diagram
     diagram_size = min(page_width / 2.2, page_height / 2.5)
@@ -169,15 +156,9 @@ def draw_round(c, cushion):
       c.setStrokeColor(red)
       c.setLineWidth(2)
 
-      prev_x = None
-      prev_y = None
-      for i in range(arc_points + 1):
-          angle = start_angle + (arc_angle * i / arc_points)
-          x = center_x + arc_radius * cos(angle)
-          y = center_y + arc_radius * sin(angle)
-          if prev_x is not None:
-              c.line(prev_x, prev_y, x, y)
-          prev_x, prev_y = x, y
+      xs, ys = arc_geometry.arc_points(center_x, center_y, arc_radius, arc_points + 1, start_angle, arc_angle)
+      for i in range(arc_points):
+          c.line(xs[i], ys[i], xs[i + 1], ys[i + 1])
 
       # Label for zipper
       label_x = center_x + arc_radius * cos(start_angle + arc_angle / 2)
@@ -0,0 +1,147 @@
+import functools
+import importlib
+import os
+
+# Import every drawer module up front (e.g. under gunicorn --preload) instead of on first use
+PRELOAD_DRAWERS = os.environ.get("PRELOAD_DRAWERS", "0") == "1"
+
+
+class Shape:
+    """A cushion shape: the drawer that paints it and the label and crop used for it.
+
+    The drawer module is named, not imported; it is loaded the first time the
+    shape's signature or drawer is needed. ``label`` is what the spec column
+    prints as "Shape" (None falls back to the cushion name); ``crop`` picks
+    the trim applied to the drawer's page.
+    """
+
+    def __init__(self, name, module, function, label=None, crop="default"):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.label = label
+        self.crop = crop
+        self._drawer = None
+        self._required = None
+
+    def _load(self):
+        module = importlib.import_module(self.module)
+        self._required = frozenset(module.REQUIRED_DIMENSIONS)
+        self._drawer = getattr(module, self.function)
+
+    @property
+    def drawer(self):
+        if self._drawer is None:
+            self._load()
+        return self._drawer
+
+    @property
+    def required(self):
+        if self._required is None:
+            self._load()
+        return self._required
+
+    def __repr__(self):
+        return f"Shape({self.name!r})"
+
+
+SHAPES = {shape.name: shape for shape in (
+    Shape("t_shape", "T_shaped_drawer", "draw_t_shape", label="T-Shape"),
+    Shape("l_shape", "L_shaped_drawer", "draw_l_shape", label="L-Shape"),
+    Shape("round", "round_drawer", "draw_round", label="Round"),
+    Shape("semi_round", "semi_round_drawer", "draw_semi_round", label="Semi Round"),
+    Shape("curved_indoor", "Curved_indoor_Cushions_drawer", "draw_curved_cushion"),
+    Shape("tapered_bolster", "tapered_bolster_drawer", "draw_tapered_bolster"),
+    Shape("curved", "curved_drawer", "draw_curved"),
+    Shape("e_triangle", "E_triangle_drawer", "draw_equilateral_triangle"),
+    Shape("left_cushion", "left_cushion_drawer", "draw_left_cushion"),
+    Shape("right_cushion", "right_cushion_drawer", "draw_right_cushion"),
+    Shape("clipped_trapeze", "clipped_trapeze_drawer", "draw_clipped_trapeze", label="Clipped Trapeze"),
+    Shape("trapezium", "trapezium_drawer", "draw_trapezium", label="Trapezoid", crop="trapezoid"),
+    Shape("rectangle", "rectangle_drawer", "draw_rectangle"),
+    Shape("right_triangle", "right_triangle_drawer", "draw_right_triangle"),
+)}
+
+
+def _cushion_name(cushion):
+    return cushion.get("cushion_name", "").lower()
+
+
+# Shape families in dispatch order: the first family whose dimensions the
+# cushion gives wins. Shapes in one family need the same dimensions and are
+# told apart by the cushion's name or proportions.
+FAMILIES = (
+    (("t_shape", "l_shape"),
+     lambda cushion: "t_shape" if cushion["top_width"] > cushion["bottom_width"] else "l_shape"),
+    (("semi_round", "round"),
+     lambda cushion: "semi_round" if "semi" in _cushion_name(cushion) else "round"),
+    (("curved_indoor",), None),
+    (("tapered_bolster",), None),
+    (("curved",), None),
+    (("e_triangle",), None),
+    (("left_cushion", "right_cushion"),
+     lambda cushion: "left_cushion" if "left" in _cushion_name(cushion) else "right_cushion"),
+    (("clipped_trapeze",), None),
+    (("trapezium",), None),
+    (("right_triangle", "rectangle"),
+     lambda cushion: "right_triangle" if "triangle" in _cushion_name(cushion) else "rectangle"),
+)
+
+# Every key any family needs; a cushion's other fields never affect dispatch.
+# Kept here rather than read from the drawers so computing a cushion's key set
+# does not import them.
+DIMENSION_KEYS = frozenset((
+    "length", "width", "thickness", "top_width", "bottom_width", "ear", "diameter",
+    "front_width_straight", "back_width_straight", "front_width_curved", "back_width_curved",
+    "top_thickness", "bottom_thickness", "height", "side_length", "middle_length", "side",
+    "edge", "top_base", "bottom_base",
+))
+
+
+def _family_required(names):
+    required = SHAPES[names[0]].required
+    if any(SHAPES[name].required != required for name in names):
+        raise ValueError(f"Shapes {names} must declare the same REQUIRED_DIMENSIONS")
+    if not required <= DIMENSION_KEYS:
+        raise ValueError(f"DIMENSION_KEYS is missing {sorted(required - DIMENSION_KEYS)}")
+    return required
+
+
+def _positive(value):
+    try:
+        return value > 0
+    except TypeError:
+        return False
+
+
+def dimension_keys(cushion):
+    """The dimension fields this cushion gives a positive value for."""
+    return frozenset(k for k in DIMENSION_KEYS if _positive(cushion.get(k)))
+
+
+@functools.lru_cache(maxsize=1024)
+def _family_for(keys):
+    # Orders repeat a handful of key sets, so each is matched against the
+    # family signatures once. Families are checked in order, so a drawer
+    # module is only imported once a cushion gets as far as its family.
+    for names, choose in FAMILIES:
+        if _family_required(names) <= keys:
+            return names, choose
+    return None
+
+
+def preload_drawers():
+    for shape in SHAPES.values():
+        shape.drawer
+
+
+def resolve_shape(cushion):
+    family = _family_for(dimension_keys(cushion))
+    if family is None:
+        raise ValueError("Unable to determine cushion shape. Missing key dimensions.")
+    names, choose = family
+    return SHAPES[choose(cushion) if choose else names[0]]
+
+
+if PRELOAD_DRAWERS:
+    preload_drawers()
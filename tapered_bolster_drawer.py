@@ -2,26 +2,11 @@ from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import black, red, blue
 import math
+from text_layout import draw_wrapped_text, wrapped_text_bottom
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
+REQUIRED_DIMENSIONS = ("top_thickness", "bottom_thickness", "height", "length")
 
-def draw_tapered_bolster(c, cushion):
+def draw_tapered_bolster(c, cushion, diagram_only=False):
     # ─── Unpack & Header ───
     page_w, page_h = letter
     name           = cushion.get("cushion_name",   "Tapered Bolster")
@@ -37,8 +22,9 @@ def draw_tapered_bolster(c, cushion):
 
     left_x = inch
     y      = page_h - inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{name} (Qty: {qty})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{name} (Qty: {qty})")
     y -= 0.4 * inch
 
     # ─── Specs table ───
@@ -58,11 +44,15 @@ def draw_tapered_bolster(c, cushion):
     
 
     for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
         max_value_width = page_w - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+        if diagram_only:
+            # Not drawn, but the diagram below is placed from where the table ends
+            y = wrapped_text_bottom(y, value, max_value_width)
+        else:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
         y -= 4  # extra spacing between spec rows
 
     # ─── Compute scale & corners ───
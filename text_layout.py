@@ -0,0 +1,59 @@
+import functools
+import os
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Distinct (text, font, size) measurements kept; spec values and fabric names repeat across orders
+TEXT_WIDTH_CACHE_SIZE = int(os.environ.get("TEXT_WIDTH_CACHE_SIZE", 8192))
+
+
+@functools.lru_cache(maxsize=TEXT_WIDTH_CACHE_SIZE)
+def text_width(text, font_name, font_size):
+    return stringWidth(text, font_name, font_size)
+
+
+def wrap_lines(text, max_width, font_name="Helvetica", font_size=12):
+    """Break text into lines no wider than max_width.
+
+    Each word is measured once and line widths are summed as words are added.
+    A word wider than max_width gets a line of its own; if it is the first
+    word, an empty line comes before it, as the drawers have always drawn it.
+    """
+    space = text_width(" ", font_name, font_size)
+    lines = []
+    words = []
+    width = 0.0
+    for word in str(text).split():
+        word_width = text_width(word, font_name, font_size)
+        candidate = width + space + word_width if words else word_width
+        if candidate <= max_width:
+            words.append(word)
+            width = candidate
+        else:
+            lines.append(" ".join(words))
+            words = [word]
+            width = word_width
+    if words:
+        lines.append(" ".join(words))
+    return lines
+
+
+def layout_wrapped_text(x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
+    """Return ([(x, y, line), ...], next_y) for text wrapped downwards from y."""
+    positioned = []
+    for line in wrap_lines(text, max_width, font_name, font_size):
+        positioned.append((x, y, line))
+        y -= line_height
+    return positioned, y
+
+
+def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
+    """Draw text wrapped at max_width in the canvas's current font; return the y below it."""
+    positioned, y = layout_wrapped_text(x, y, text, max_width, font_name, font_size, line_height)
+    for line_x, line_y, line in positioned:
+        c.drawString(line_x, line_y, line)
+    return y
+
+
+def wrapped_text_bottom(y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
+    """The y draw_wrapped_text would return, without drawing anything."""
+    return layout_wrapped_text(0, y, text, max_width, font_name, font_size, line_height)[1]
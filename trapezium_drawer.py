@@ -5,25 +5,10 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.colors import black, red, purple, green
+from text_layout import draw_wrapped_text, wrapped_text_bottom
 
+REQUIRED_DIMENSIONS = ("top_base", "bottom_base", "height")
 
-def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size=12, line_height=14):
-    from reportlab.pdfbase.pdfmetrics import stringWidth
-    words = text.split()
-    line = ""
-    for word in words:
-        test_line = f"{line} {word}".strip()
-        width = stringWidth(test_line, font_name, font_size)
-        if width <= max_width:
-            line = test_line
-        else:
-            c.drawString(x, y, line)
-            y -= line_height
-            line = word
-    if line:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y  # return new y position
 
 # === INPUT DATA ===
 # cushions = [
@@ -87,7 +72,7 @@ def draw_wrapped_text(c, x, y, text, max_width, font_name="Helvetica", font_size
 # c.showPage()
 
 # === DRAW PAGES FOR EACH CUSHION ===
-def draw_trapezium(c,cushion):
+def draw_trapezium(c,cushion, diagram_only=False):
     page_width, page_height = letter
     cushion_name = cushion.get('cushion_name', 'Cushion Specifications')
     top_base_in = cushion['top_base']
@@ -113,8 +98,9 @@ def draw_trapezium(c,cushion):
     #     y -= 18
     left_x = 1 * inch
     y = page_height - 1 * inch
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
+    if not diagram_only:
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(left_x, y, f"{cushion_name} (Quantity: {quantity})")
 
     y -= 0.4 * inch
 
@@ -141,11 +127,15 @@ def draw_trapezium(c,cushion):
     
 
     for label, value in specs:
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left_x, y, f"{label}:")
-        c.setFont("Helvetica", 12)
         max_value_width = page_width - (left_x + 130 + inch)  # dynamic width limit
-        y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
+        if diagram_only:
+            # Not drawn, but the diagram below is placed from where the table ends
+            y = wrapped_text_bottom(y, value, max_value_width)
+        else:
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(left_x, y, f"{label}:")
+            c.setFont("Helvetica", 12)
+            y = draw_wrapped_text(c, left_x + 130, y, value, max_width=max_value_width)
         y -= 4  # extra spacing between spec rows
 
 